@@ -1,31 +1,87 @@
-from flask import Flask, Response, request, jsonify
+from flask import Flask, Response, request, abort
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from dotenv import load_dotenv
 from camera import VideoCamera
-from brain.llm_engine import process_command
+from brain.llm_engine import process_command_async, LLM_TIMEOUT
 from brain.kinematics import solve_angles, compute_forward_kinematics
 from hardware.robot_driver import RobotArm
 from visual_servoing import VisualServoingAgent
 from features.mimic_logic import MimicController
 from pick_place_controller import PickPlaceController
+from frame_broadcaster import FrameBroadcaster
 import traceback
+import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 import time
 import json
 import threading
-import cv2
 import numpy as np
 from keyboard_controller import KeyboardController
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load .env from the backend directory explicitly
 import os
 basedir = os.path.abspath(os.path.dirname(__file__))
 load_dotenv(os.path.join(basedir, '.env'))
 
+# Per-frame / per-move chatter (camera status ticker, serial packets) is logged at
+# DEBUG; set LOGLEVEL=DEBUG to see it
+logging.basicConfig(level=os.environ.get('LOGLEVEL', 'INFO').upper(), format='%(message)s')
+log = logging.getLogger(__name__)
+
+def _json_default(obj):
+    """Encoder fallback: numpy values (for stdlib json), then Flask's extra types."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return DefaultJSONProvider.default(obj)
+
+# One encoder configuration for dumps_json()/ojsonify() and jsonify(), so every
+# route accepts the same payloads (numpy values, non-string keys, Flask's types)
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+def dumps_json(obj):
+    """Serialize to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_json_default, option=ORJSON_OPTIONS)
+    return json.dumps(obj, default=_json_default).encode('utf-8')
+
+if orjson is not None:
+    class OrjsonProvider(DefaultJSONProvider):
+        """flask.json provider backed by orjson, so jsonify/get_json skip the stdlib encoder too."""
+
+        def dumps(self, obj, **kwargs):
+            return dumps_json(obj).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+# Largest POST body accepted by the JSON routes (commands are a few hundred bytes)
+MAX_JSON_BODY = 4096
+
 app = Flask(__name__)
+# No debugger or template reloading, and compact unsorted output for anything
+# still serialized through flask.json (the hot routes use ojsonify instead).
+# MAX_CONTENT_LENGTH makes Werkzeug cap the body stream itself, so a chunked
+# body without Content-Length is cut off with 413 instead of read into memory.
+app.config.update(DEBUG=False, TEMPLATES_AUTO_RELOAD=False, MAX_CONTENT_LENGTH=MAX_JSON_BODY)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+app.json.sort_keys = False
+app.json.compact = True
 CORS(app)
 
 # Initialize camera with YOLO detection mode
-global_camera = VideoCamera(detection_mode='yolo')
+# Detection only runs while a stream, the servoing loop or a recent API caller needs it
+global_camera = VideoCamera(detection_mode='yolo', detect_on_demand=True)
+# Single reader that fans frames out to every /video_feed client
+frame_broadcaster = FrameBroadcaster(global_camera)
 # Initialize robot in HARDWARE mode to communicate with Arduino on COM4
 # If Arduino is not connected, it will automatically fall back to simulation mode
 robot = RobotArm(simulation_mode=False, port='COM4', baudrate=115200)
@@ -47,74 +103,121 @@ servoing_agent = VisualServoingAgent(robot, global_camera, on_grab_complete=on_g
 keyboard_ctrl = KeyboardController(robot)
 keyboard_ctrl.start()
 
+def ojsonify(obj):
+    """Drop-in replacement for flask.jsonify backed by dumps_json()."""
+    return Response(dumps_json(obj), mimetype='application/json')
+
+def read_json_body():
+    """
+    Parse the request body as a JSON object in a single read.
+    Oversized bodies are rejected with 413 (Werkzeug enforces MAX_CONTENT_LENGTH
+    on the stream; the checks here only give the helper its own error path),
+    malformed JSON with 400. An empty body or a non-object payload yields {}.
+    Call this outside the route's try/except so the abort is not turned into a 500.
+    """
+    if request.content_length is not None and request.content_length > MAX_JSON_BODY:
+        abort(413)
+    raw = request.get_data(cache=False)
+    if not raw:
+        return {}
+    if len(raw) > MAX_JSON_BODY:
+        abort(413)
+    try:
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except ValueError:
+        abort(400, description="Malformed JSON body")
+    return data if isinstance(data, dict) else {}
+
 # ... (Routes) ...
 
+# Servoing restarts run off the request thread: stop() joins the old loop for up
+# to 1s and start() re-targets YOLO-World. A single worker keeps back-to-back
+# commands in order. Progress is reported by /servoing_status.
+_servo_dispatch = ThreadPoolExecutor(max_workers=1, thread_name_prefix="servo-dispatch")
+
+def restart_servoing(target_object, auto_place):
+    """Queue a stop + start of the servoing agent and return immediately."""
+    def _restart():
+        try:
+            servoing_agent.stop()
+            servoing_agent.start(target_object, auto_place=auto_place)
+        except Exception:
+            traceback.print_exc()
+    _servo_dispatch.submit(_restart)
+
 @app.route('/start_servoing', methods=['POST'])
 def start_servoing():
-    data = request.json
+    data = read_json_body()
     target_object = data.get('target_object')
     if not target_object:
-        return jsonify({"error": "Target object required"}), 400
+        return ojsonify({"error": "Target object required"}), 400
         
     servoing_agent.start(target_object)
-    return jsonify({"status": "started", "target": target_object})
+    return ojsonify({"status": "started", "target": target_object})
 
 @app.route('/stop_servoing', methods=['POST'])
 def stop_servoing():
     servoing_agent.stop()
-    return jsonify({"status": "stopped"})
+    return ojsonify({"status": "stopped"})
 
 @app.route('/servoing_status', methods=['GET'])
 def get_servoing_status():
-    return jsonify(servoing_agent.get_status())
+    return ojsonify(servoing_agent.get_status())
 
 # --- PICK-AND-PLACE INTEGRATION ---
 @app.route('/pick_place/start', methods=['POST'])
 def start_pick_place():
     """Start pick-and-place operation."""
+    data = read_json_body()
     try:
-        data = request.json or {}
         target_angle = data.get('target_base_angle', 0)  # Default to 0 degrees
         
         success = pick_place_ctrl.start(target_base_angle=target_angle)
         
         if success:
-            return jsonify({
+            return ojsonify({
                 "status": "started",
                 "target_angle": target_angle,
                 "message": "Pick-and-place sequence started"
             })
         else:
-            return jsonify({
+            return ojsonify({
                 "status": "already_running",
                 "message": "Pick-and-place is already in progress"
             }), 400
     except Exception as e:
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
 
 @app.route('/pick_place/stop', methods=['POST'])
 def stop_pick_place():
     """Emergency stop pick-and-place operation."""
     try:
         pick_place_ctrl.stop()
-        return jsonify({
+        return ojsonify({
             "status": "stopped",
             "message": "Pick-and-place stopped"
         })
     except Exception as e:
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
 
 @app.route('/pick_place/status', methods=['GET'])
 def get_pick_place_status():
     """Get current pick-and-place status and telemetry."""
     try:
         status = pick_place_ctrl.get_status()
-        return jsonify(status)
+        return ojsonify(status)
     except Exception as e:
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
+
+# --- MJPEG STREAMING ---
+# Multipart framing is pre-built so each frame only formats its length; the
+# header, JPEG and trailer are yielded separately to avoid concatenating
+# a full-size copy of every frame.
+MJPEG_PART_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n'
+MJPEG_PART_TRAILER = b'\r\n'
 
 # --- MIMIC MODE INTEGRATION ---
 mimic_thread = None
@@ -138,10 +241,10 @@ def start_mimic():
         mimic_thread.daemon = True
         mimic_thread.start()
         print("[DEBUG] Mimic thread started", flush=True)
-        return jsonify({"status": "started", "message": "Mimic Mode Active"})
+        return ojsonify({"status": "started", "message": "Mimic Mode Active"})
     else:
         print("[DEBUG] Thread already running", flush=True)
-        return jsonify({"status": "already_running"})
+        return ojsonify({"status": "already_running"})
 
 @app.route('/mimic_stop', methods=['POST'])
 def stop_mimic():
@@ -151,47 +254,33 @@ def stop_mimic():
     global_camera.pause_yolo = False
     print("[INFO] YOLO detection resumed", flush=True)
     
-    return jsonify({"status": "stopped", "message": "Mimic Mode Stopping..."})
+    return ojsonify({"status": "stopped", "message": "Mimic Mode Stopping..."})
 
 @app.route('/mimic_telemetry', methods=['GET'])
 def get_mimic_telemetry():
     """Get current mimic mode telemetry (error_x, error_y, reach, gripper)"""
     telemetry = mimic_ctrl.get_telemetry()
     telemetry["active"] = mimic_ctrl.active
-    return jsonify(telemetry)
+    return ojsonify(telemetry)
+
+# Hand-overlay frames are drawn and encoded once per camera frame, shared by all clients
+mimic_broadcaster = FrameBroadcaster(mimic_ctrl)
 
-def gen_mimic(camera):
+def gen_mimic(broadcaster):
     """Generator for mimic mode video feed with ONLY hand overlay (no YOLO)"""
     while True:
-        # Get raw frame without YOLO processing
-        raw_frame = camera.get_raw_frame()
-        if raw_frame is None:
-            time.sleep(0.01)
+        frame = broadcaster.get_frame()
+        if frame is None:
             continue
         
-        # Create a copy for processing
-        img = raw_frame.copy()
-        
-        # Add "Mode: HAND TRACKING" text
-        cv2.putText(img, "Mode: HAND TRACKING", (10, 30),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        
-        # Add hand landmarks if mimic mode is active
-        if mimic_ctrl.active:
-            img = mimic_ctrl.draw_hand_overlay(img)
-        
-        # Encode to JPEG
-        _, jpeg = cv2.imencode('.jpg', img)
-        frame = jpeg.tobytes()
-        
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n\r\n')
-        time.sleep(0.03)
+        yield MJPEG_PART_HEADER % len(frame)
+        yield frame
+        yield MJPEG_PART_TRAILER
 
 @app.route('/mimic_video_feed')
 def mimic_video_feed():
     """Video feed endpoint for Mimic Mode page"""
-    return Response(gen_mimic(global_camera),
+    return Response(gen_mimic(mimic_broadcaster),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
 
 
@@ -199,47 +288,115 @@ def mimic_video_feed():
 
 
 
-def gen(camera):
-    while True:
-        frame = camera.get_frame()
-        if frame is None:
-            time.sleep(0.01)
-            continue
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n\r\n')
-        # Cap to ~30 FPS
-        time.sleep(0.03)
+def gen(broadcaster, target_fps=None):
+    """
+    Generator for the main video feed. Blocks until the broadcaster has a new frame.
+    With target_fps set, frames arriving ahead of schedule are dropped (never
+    queued), so a slow client stays at most one frame behind real time.
+    """
+    min_interval = 1.0 / target_fps if target_fps else None
+    next_due = 0.0
+    # The overlay shows detections, so keep them running while this client is connected
+    broadcaster.camera.add_detection_consumer()
+    try:
+        while True:
+            frame = broadcaster.get_frame()
+            if frame is None:
+                continue
+            if min_interval is not None:
+                now = time.monotonic()
+                if now < next_due:
+                    continue
+                # Deadline schedule: a frame arriving a little late doesn't push
+                # the next slot back, so arrival jitter doesn't cost extra frames
+                next_due += min_interval
+                if next_due < now:
+                    # Far behind (first frame or a stall): resync instead of bursting
+                    next_due = now + min_interval
+            yield MJPEG_PART_HEADER % len(frame)
+            yield frame
+            yield MJPEG_PART_TRAILER
+    finally:
+        broadcaster.camera.remove_detection_consumer()
+
+# Nominal camera rate; ?fps at or above it streams every frame unthrottled
+SOURCE_FPS = 30.0
 
 @app.route('/video_feed')
 def video_feed():
-    return Response(gen(global_camera),
+    """MJPEG stream. Optional ?fps=N lowers the frame rate for bandwidth-limited clients."""
+    target_fps = request.args.get('fps', type=float)
+    if target_fps is not None:
+        target_fps = max(1.0, target_fps)
+        if target_fps >= SOURCE_FPS:
+            target_fps = None
+    return Response(gen(frame_broadcaster, target_fps),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
 
+@app.route('/snapshot')
+def snapshot():
+    """Latest JPEG frame, for clients that prefer polling an <img> over a stream."""
+    global_camera.request_detections()  # Pollers keep the overlay live
+    frame = global_camera.get_frame()
+    if frame is None:
+        return ojsonify({"error": "No frame available"}), 503
+    response = Response(frame, mimetype='image/jpeg')
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
 @app.route('/set_target_color', methods=['POST'])
 def set_target_color():
-    data = request.json
+    data = read_json_body()
     colors = data.get('colors')
     if not colors:
         colors = None
     global_camera.set_target_colors(colors)
-    return jsonify({"status": "success", "targets": colors})
+    return ojsonify({"status": "success", "targets": colors})
+
+# Serialized /get_detection_result body, keyed by camera.detection_version
+_detection_body_cache = (None, None)
+# Upper bound for the ?wait= long-poll, in seconds
+MAX_DETECTION_WAIT = 30.0
 
 @app.route('/get_detection_result', methods=['GET'])
 def get_detection_result():
+    global _detection_body_cache
     try:
-        if global_camera.last_detection and len(global_camera.last_detection) > 0:
-            return jsonify({
-                "status": "found",
-                "data": global_camera.last_detection,
-                "count": len(global_camera.last_detection)
-            })
-        else:
-            return jsonify({"status": "searching"})
+        global_camera.request_detections()  # Pollers keep detection alive
+        # Single read of the slot: version and list are swapped together
+        version, detections = global_camera.get_detection_snapshot()
+        etag = str(version)
+        if etag in request.if_none_match:
+            # Long-poll: with ?wait=N, hold the request until the next detection
+            # pass (or N seconds) instead of making the client poll
+            wait = min(max(request.args.get('wait', 0.0, type=float), 0.0), MAX_DETECTION_WAIT)
+            if wait > 0:
+                version, detections = global_camera.wait_for_detection(version, wait)
+                etag = str(version)
+            if etag in request.if_none_match:
+                return Response(status=304)
+        
+        cached_version, body = _detection_body_cache
+        if cached_version != version:
+            if detections:
+                payload = {
+                    "status": "found",
+                    "data": detections,
+                    "count": len(detections)
+                }
+            else:
+                payload = {"status": "searching"}
+            body = dumps_json(payload)
+            _detection_body_cache = (version, body)
+        
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        return response
     except Exception as e:
         print(f"[ERROR] /get_detection_result failed: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({"error": str(e), "status": "error"}), 500
+        return ojsonify({"error": str(e), "status": "error"}), 500
 
 @app.route('/set_target_object', methods=['POST'])
 def set_target_object():
@@ -247,38 +404,45 @@ def set_target_object():
     Set target object for center-seeking mode.
     Only the specified object will be detected and shown.
     """
+    data = read_json_body()
     try:
-        data = request.json
         object_name = data.get('object_name')  # e.g., "bottle", "cup"
         
         if object_name:
             global_camera.set_target_object(object_name)
-            return jsonify({
+            return ojsonify({
                 "status": "success",
                 "target_object": object_name,
                 "message": f"Target object set to: {object_name}"
             })
         else:
             global_camera.clear_target_object()
-            return jsonify({
+            return ojsonify({
                 "status": "success",
                 "target_object": None,
                 "message": "Target object cleared - showing all objects"
             })
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
+
+# Health-poll bodies are serialized once per distinct state and then reused
+_status_bodies = {}  # (camera open, simulation mode) -> JSON bytes
 
 @app.route('/status', methods=['GET'])
 def status():
-    vision_status = "active" if global_camera.video.isOpened() else "inactive"
-    servo_status = "on" # Mocked
-    
-    return jsonify({
-        "backend": "connected",
-        "vision": vision_status,
-        "servo": servo_status,
-        "robot_mode": "simulation" if robot.simulation_mode else "hardware"
-    })
+    state = (global_camera.is_open, robot.simulation_mode)
+    body = _status_bodies.get(state)
+    if body is None:
+        vision_status = "active" if state[0] else "inactive"
+        servo_status = "on" # Mocked
+        
+        body = _status_bodies[state] = dumps_json({
+            "backend": "connected",
+            "vision": vision_status,
+            "servo": servo_status,
+            "robot_mode": "simulation" if state[1] else "hardware"
+        })
+    return Response(body, mimetype='application/json')
 
 @app.route('/manual_control', methods=['POST'])
 def manual_control():
@@ -286,71 +450,105 @@ def manual_control():
     Direct manual control endpoint for Engineer Mode.
     Accepts 6 servo angles and sends them directly to the robot.
     """
+    data = read_json_body()
     try:
-        data = request.json
         angles = data.get('angles')
         
         if not angles:
-            return jsonify({"error": "No angles provided"}), 400
+            return ojsonify({"error": "No angles provided"}), 400
+        
+        if not isinstance(angles, list):
+            return ojsonify({"error": "Angles must be a list of 6 numbers"}), 400
         
         if len(angles) != 6:
-            return jsonify({"error": f"Expected 6 angles, got {len(angles)}"}), 400
+            return ojsonify({"error": f"Expected 6 angles, got {len(angles)}"}), 400
         
-        # Validate all angles are in 0-180 range
-        for i, angle in enumerate(angles):
-            if not isinstance(angle, (int, float)):
-                return jsonify({"error": f"Invalid angle at index {i}: must be a number"}), 400
-            if angle < 0 or angle > 180:
-                return jsonify({"error": f"Invalid angle at index {i}: {angle}° (must be 0-180)"}), 400
+        # Validate all angles are finite numbers in 0-180 range in one vectorized check;
+        # the per-angle loop only runs to explain a rejection
+        try:
+            a = np.asarray(angles)
+        except (ValueError, TypeError):
+            a = None  # Ragged/nested input: let the loop below name the bad entry
+        if (a is None or a.ndim != 1 or a.dtype.kind not in 'biuf'
+                or not (np.isfinite(a) & (a >= 0) & (a <= 180)).all()):
+            for i, angle in enumerate(angles):
+                if not isinstance(angle, (int, float)):
+                    return ojsonify({"error": f"Invalid angle at index {i}: must be a number"}), 400
+                if not 0 <= angle <= 180:
+                    return ojsonify({"error": f"Invalid angle at index {i}: {angle}° (must be 0-180)"}), 400
+            return ojsonify({"error": "Invalid angles"}), 400
         
-        # Send to robot
-        success = robot.move_to(angles)
+        # Hand off to the robot's motion worker; rapid slider updates are coalesced
+        # so only the newest target is written to the serial port
+        target = a.tolist()
+        robot.enqueue(target)
         
-        if success:
-            return jsonify({
-                "status": "success",
-                "angles": robot.current_angles,
-                "mode": "simulation" if robot.simulation_mode else "hardware"
-            })
-        else:
-            return jsonify({"error": "Failed to move robot"}), 500
+        return ojsonify({
+            "status": "success",
+            "angles": target,
+            "mode": "simulation" if robot.simulation_mode else "hardware"
+        })
             
     except Exception as e:
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
+
+# (angles version, simulation mode, connected) -> JSON bytes of the last reply
+_servo_positions_body = (None, None)
 
 @app.route('/get_servo_positions', methods=['GET'])
 def get_servo_positions():
     """
     Get current servo positions for real-time feedback.
+    The body is only re-serialized after the angles or connection state change.
     """
+    global _servo_positions_body
     try:
-        return jsonify({
-            "status": "success",
-            "angles": robot.current_angles,
-            "mode": "simulation" if robot.simulation_mode else "hardware",
-            "connected": robot.serial.is_open if robot.serial else False
-        })
+        state = (robot.angles_version, robot.simulation_mode, robot.is_open)
+        cached_state, body = _servo_positions_body
+        if state != cached_state:
+            body = dumps_json({
+                "status": "success",
+                "angles": robot.current_angles,
+                "mode": "simulation" if state[1] else "hardware",
+                "connected": state[2]
+            })
+            _servo_positions_body = (state, body)
+        return Response(body, mimetype='application/json')
     except Exception as e:
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
         
 
+# Seconds between SSE comment lines while nothing changes (keeps proxies from closing the stream)
+SSE_KEEPALIVE = 15.0
+
 def generate_servo_stream():
-    """Generator function for SSE servo updates."""
+    """
+    Generator function for SSE servo updates.
+    Pushes a packet only when the robot's angles (or connection state) change,
+    instead of re-serializing the same state every 100ms.
+    """
+    last_version = None
+    last_payload = None
+    last_sent = 0.0
     while True:
         try:
+            # Wakes on every move_to() update; times out after 1s to re-check connection state
+            version, angles = robot.wait_for_angles(last_version, timeout=1.0)
+            last_version = version
+            
             # Calculate XYZ coordinates from current angles
-            x, y, z = compute_forward_kinematics(robot.current_angles)
+            x, y, z = compute_forward_kinematics(angles)
             
             # Determine gripper state based on angle
             # Typically: 0-60° = CLOSED, 60-180° = OPEN
-            gripper_angle = robot.current_angles[5]
+            gripper_angle = angles[5]
             gripper_state = "OPEN" if gripper_angle > 60 else "CLOSED"
             
             # Create data packet
             data = {
-                "angles": robot.current_angles,
+                "angles": angles,
                 "coordinates": {
                     "x": x,
                     "y": y,
@@ -358,11 +556,19 @@ def generate_servo_stream():
                 },
                 "gripper_state": gripper_state,
                 "mode": "simulation" if robot.simulation_mode else "hardware",
-                "connected": robot.serial.is_open if robot.serial else False
+                "connected": robot.is_open
             }
+            payload = dumps_json(data)
+            now = time.time()
+            if payload == last_payload:
+                if now - last_sent >= SSE_KEEPALIVE:
+                    last_sent = now
+                    yield b": keepalive\n\n"
+                continue
+            last_payload = payload
+            last_sent = now
             # Format as SSE message
-            yield f"data: {json.dumps(data)}\n\n"
-            time.sleep(0.1) # 100ms update rate
+            yield b"data: " + payload + b"\n\n"
         except Exception as e:
             print(f"Stream error: {e}")
             break
@@ -379,7 +585,7 @@ def emergency_stop():
              pass
         
         # Return response before dying so frontend knows it worked
-        response = jsonify({"status": "stopping", "message": "Backend shutting down immediately"})
+        response = ojsonify({"status": "stopping", "message": "Backend shutting down immediately"})
         
         # Schedule death in 1 second to allow response to send
         import threading
@@ -393,12 +599,16 @@ def emergency_stop():
         
         return response
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
 
 @app.route('/servo_stream')
 def servo_stream():
     """Endpoint for Server-Sent Events of servo positions."""
-    return Response(generate_servo_stream(), mimetype='text/event-stream')
+    # The generator already yields ready-made bytes, so skip Werkzeug's per-item
+    # encoding wrapper; no-cache/X-Accel-Buffering stop proxies batching events
+    return Response(generate_servo_stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+                    direct_passthrough=True)
 
 @app.route('/process_command', methods=['POST'])
 def handle_command():
@@ -409,54 +619,59 @@ def handle_command():
     3. Calls IK to get angles for each step.
     4. Calls RobotDriver to execute (simulated).
     """
+    data = read_json_body()
     try:
-        data = request.json
         user_text = data.get('command')
         
         if not user_text:
-            return jsonify({"error": "No command provided"}), 400
+            return ojsonify({"error": "No command provided"}), 400
 
-        # 1. Prepare Vision State
-        vision_state = {}
-        if global_camera.last_detection:
-            for obj in global_camera.last_detection:
-                if 'object_name' in obj:
-                    key = obj['object_name'].lower().replace(' ', '_')
-                    vision_state[key] = [obj.get('cm_x', 0), obj.get('cm_y', 0), 0]
+        # 1. Prepare Vision State (pre-built by the camera on each detection pass).
+        # If detection was idle, give it one pass so the LLM sees the current scene.
+        was_detecting = global_camera.detection_active
+        global_camera.request_detections()
+        if not was_detecting:
+            global_camera.wait_for_detection(global_camera.detection_version, timeout=1.0)
+        vision_state = global_camera.vision_state
 
         # 2. Call LLM
-        print(f"[DEBUG] Processing command: '{user_text}'")
-        llm_response = process_command(user_text, vision_state)
+        log.debug("Processing command: '%s'", user_text)
+        future = process_command_async(user_text, vision_state)
+        try:
+            # The client does not retry, so LLM_TIMEOUT bounds the SDK call;
+            # a running call cannot be cancelled, so wait it out rather than
+            # answering 504 while the worker is still busy
+            llm_response = future.result(timeout=LLM_TIMEOUT + 5)
+        except FuturesTimeoutError:
+            return ojsonify({"status": "error", "reply": "The robot's brain took too long to respond."}), 504
         
         intent = llm_response.get("intent")
         target_object = llm_response.get("target_object")
         params = llm_response.get("params", {})
         reply = llm_response.get("reply", "Command processed.")
         
-        print(f"[DEBUG] LLM Intent: {intent} | Target: {target_object} | Params: {params}")
+        log.debug("LLM Intent: %s | Target: %s | Params: %s", intent, target_object, params)
 
         # 3. Execute Intent
         if intent == "PICK_ONLY":
             if target_object:
                 if servoing_agent:
-                    servoing_agent.stop()
-                    servoing_agent.start(target_object, auto_place=False) # PICK ONLY
-                    return jsonify({"status": "success", "reply": reply})
+                    restart_servoing(target_object, auto_place=False) # PICK ONLY
+                    return ojsonify({"status": "success", "reply": reply})
                 else:
-                    return jsonify({"status": "error", "reply": "Servoing agent not initialized."})
+                    return ojsonify({"status": "error", "reply": "Servoing agent not initialized."})
             else:
-                return jsonify({"status": "error", "reply": "I couldn't identify which object to pick."})
+                return ojsonify({"status": "error", "reply": "I couldn't identify which object to pick."})
 
         elif intent == "PICK_AND_PLACE":
             if target_object:
                 if servoing_agent:
-                    servoing_agent.stop()
-                    servoing_agent.start(target_object, auto_place=True) # FULL AUTO
-                    return jsonify({"status": "success", "reply": reply})
+                    restart_servoing(target_object, auto_place=True) # FULL AUTO
+                    return ojsonify({"status": "success", "reply": reply})
                 else:
-                    return jsonify({"status": "error", "reply": "Servoing agent not initialized."})
+                    return ojsonify({"status": "error", "reply": "Servoing agent not initialized."})
             else:
-                 return jsonify({"status": "error", "reply": "I couldn't identify which object to pick."})
+                 return ojsonify({"status": "error", "reply": "I couldn't identify which object to pick."})
 
         elif intent == "PLACE_ONLY":
             modifier = params.get("modifier", "normal")
@@ -466,16 +681,19 @@ def handle_command():
             
             success = pick_place_ctrl.start(target_base_angle=current_base_angle, modifier=modifier)
             if success:
-                return jsonify({"status": "success", "reply": f"Placing object here ({modifier})."})
+                return ojsonify({"status": "success", "reply": f"Placing object here ({modifier})."})
             else:
-                return jsonify({"status": "error", "reply": "Could not start placement (maybe already running?)."})
+                return ojsonify({"status": "error", "reply": "Could not start placement (maybe already running?)."})
 
         elif intent == "MOVE_BASE":
             angle = params.get("angle")
             direction = params.get("direction")
             
             if angle is not None:
-                current_base = robot.current_angles[0]
+                # Relative to the commanded target, not current_angles: a previous
+                # command may still be queued or moving, and would otherwise be lost
+                commanded = robot.commanded_angles
+                current_base = commanded[0]
                 new_base = current_base
                 
                 if direction == "right":
@@ -486,14 +704,14 @@ def handle_command():
                 # Clamp
                 new_base = max(0, min(180, new_base))
                 
-                # Move
-                angles = list(robot.current_angles)
+                # Move (on the motion worker, so the reply doesn't wait on the serial ACK)
+                angles = list(commanded)
                 angles[0] = int(new_base)
-                robot.move_to(angles)
+                robot.enqueue(angles)
                 
-                return jsonify({"status": "success", "reply": f"Rotated base to {new_base} degrees."})
+                return ojsonify({"status": "success", "reply": f"Rotated base to {new_base} degrees."})
             else:
-                return jsonify({"status": "error", "reply": "No angle specified for movement."})
+                return ojsonify({"status": "error", "reply": "No angle specified for movement."})
         
         elif intent == "EXTEND" or intent == "RETRACT":
             angle = params.get("angle", 10) # Default step
@@ -514,34 +732,36 @@ def handle_command():
                 delta_s = delta_s   # Shoulder up
                 delta_e = -delta_e  # Elbow down
                 
-            current_s = robot.current_angles[1]
-            current_e = robot.current_angles[2]
+            # Relative to the commanded target (see MOVE_BASE)
+            commanded = robot.commanded_angles
+            current_s = commanded[1]
+            current_e = commanded[2]
             
             new_s = max(0, min(180, current_s + delta_s))
             new_e = max(0, min(180, current_e + delta_e))
             
-            angles = list(robot.current_angles)
+            angles = list(commanded)
             angles[1] = int(new_s)
             angles[2] = int(new_e)
             
-            success = robot.move_to(angles)
+            robot.enqueue(angles)
             
             action = "Extended" if intent == "EXTEND" else "Retracted"
-            return jsonify({
+            return ojsonify({
                 "status": "success", 
                 "reply": f"{action} arm (S:{int(new_s)}, E:{int(new_e)})."
             })
 
         else:
             # Fallback / Unclear
-            return jsonify({
+            return ojsonify({
                 "status": "success", 
                 "reply": reply or "I'm not sure what you want me to do."
             })
 
     except Exception as e:
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
+        return ojsonify({"error": str(e)}), 500
 
 if __name__ == '__main__':
     try:
@@ -552,6 +772,8 @@ if __name__ == '__main__':
         print(" ℹ️  To start Auto-Alignment (Visual Servoing):")
         print("    POST /start_servoing with {'target_object': 'red'}")
         print("==================================================================\n")
-        app.run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
+        # No debugger middleware; threaded so /video_feed doesn't block other routes.
+        # For deployments use wsgi.py (Waitress / gunicorn gthread).
+        app.run(host='0.0.0.0', port=5000, debug=False, threaded=True, use_reloader=False)
     finally:
         del global_camera
@@ -3,7 +3,7 @@ import torch.nn as nn
 import numpy as np
 
 class GaussianMembership(nn.Module):
-    """Layer 1: Learnable Gaussian Membership Functions"""
+    """Layer 1: Learnable Gaussian Membership Functions (returns log-membership)"""
     def __init__(self, n_inputs, n_rules, input_ranges=None):
         super().__init__()
         self.n_inputs = n_inputs
@@ -33,14 +33,30 @@ class GaussianMembership(nn.Module):
             self.mu = nn.Parameter(torch.stack(mus))
             self.sigma = nn.Parameter(torch.stack(sigmas))
 
+        # -0.5 / sigma^2, precomputed by freeze() for inference (not saved in checkpoints)
+        self.register_buffer('neg_half_inv_sigma_sq', None, persistent=False)
+
+    def freeze(self):
+        """Precompute the per-rule Gaussian scale from the current sigma for eval-mode forwards."""
+        with torch.no_grad():
+            self.neg_half_inv_sigma_sq = (-0.5 / (self.sigma * self.sigma)).contiguous()
+
     def forward(self, x):
         # x shape: (batch_size, n_inputs)
-        # Expand x to (batch_size, n_inputs, n_rules) for broadcasting
-        x = x.unsqueeze(2).expand(-1, -1, self.n_rules)
-        
+        if not self.training and self.neg_half_inv_sigma_sq is not None:
+            # Frozen: -0.5 * ((x - mu) / sigma)^2 == (x - mu)^2 * (-0.5 / sigma^2)
+            d = x.unsqueeze(2) - self.mu
+            return d * d * self.neg_half_inv_sigma_sq
+
+        # (batch, n_inputs, 1) broadcasts against mu/sigma (n_inputs, n_rules)
+        # Reciprocal is taken on the small parameter tensor, so the batch-sized
+        # chain is sub, mul, mul (no pow, no expanded copy of x)
+        z = (x.unsqueeze(2) - self.mu) * self.sigma.reciprocal()
+
         # Gaussian formula: exp( -0.5 * ((x - mu) / sigma)^2 )
-        exponent = -0.5 * ((x - self.mu) / self.sigma) ** 2
-        return torch.exp(exponent)
+        # Stay in the log domain: ANFIS sums these instead of multiplying the
+        # memberships, which cannot underflow and saves the exp here
+        return -0.5 * z * z
 
 class ANFIS(nn.Module):
     def __init__(self, n_inputs=2, n_rules=8, input_ranges=None):
@@ -59,50 +75,40 @@ class ANFIS(nn.Module):
         self.consequent_weights = nn.Parameter(torch.zeros(n_rules, n_inputs))
         self.consequent_bias = nn.Parameter(torch.zeros(n_rules))
 
+    def freeze(self):
+        """
+        Switch to eval mode with inference-time constants precomputed.
+        Call after load_state_dict(); training mode ignores the cached values.
+        """
+        self.eval()
+        self.fuzzification.freeze()
+        return self
+
     def forward(self, x):
-        # --- Layer 1: Membership Degrees ---
+        # --- Layer 1: Membership Degrees (log) ---
         # shape: (batch, n_inputs, n_rules)
-        mu = self.fuzzification(x) 
+        log_mu = self.fuzzification(x)
         
         # --- Layer 2: Firing Strength (T-Norm / Product) ---
-        # We multiply membership degrees across inputs for each rule
+        # Product of memberships across inputs = sum of their logs
         # shape: (batch, n_rules)
-        w = torch.prod(mu, dim=1) 
+        log_w = torch.sum(log_mu, dim=1)
         
         # --- Layer 3: Normalization ---
+        # w / sum(w) == softmax(log w); the max-shift inside softmax keeps it
+        # finite even when every rule fires ~0, so no epsilon guard is needed
         # shape: (batch, n_rules)
-        w_sum = torch.sum(w, dim=1, keepdim=True)
-        w_norm = w / (w_sum + 1e-8) # Avoid division by zero
-        
-        # --- Layer 4: Rule Outputs (Takagi-Sugeno) ---
-        # Each rule outputs: f_i = p_i*x + q_i
-        # x: (batch, n_inputs)
-        # weights: (n_rules, n_inputs)
-        # To compute p_i * x for each rule and batch:
-        # We want result (batch, n_rules)
+        w_norm = torch.softmax(log_w, dim=1)
         
-        # Expand x to (batch, 1, n_inputs)
-        x_expanded = x.unsqueeze(1) # (batch, 1, n_inputs)
-        
-        # Weights (n_rules, n_inputs) -> Transpose to (n_inputs, n_rules) for matmul?
-        # Or just element-wise multiply and sum?
-        # Let's do:
-        # (batch, 1, inputs) * (1, rules, inputs) -> (batch, rules, inputs) -> sum(-1) -> (batch, rules)
-        
-        # Broadcasting strategy:
-        # x_expanded: (batch, 1, n_inputs)
-        # weights_expanded: (1, n_rules, n_inputs)
-        # product: (batch, n_rules, n_inputs)
-        # sum: (batch, n_rules)
-        
-        term1 = torch.matmul(x, self.consequent_weights.t()) # (batch, n_inputs) @ (n_inputs, n_rules) -> (batch, n_rules)
-        
-        rule_outputs = term1 + self.consequent_bias # (batch, n_rules)
-        
-        # --- Layer 5: Aggregation ---
-        # Final output = sum(w_norm * rule_output)
-        # w_norm: (batch, n_rules)
-        # rule_outputs: (batch, n_rules)
-        output = torch.sum(w_norm * rule_outputs, dim=1, keepdim=True)
+        # --- Layers 4 + 5: Rule Outputs (Takagi-Sugeno) and Aggregation ---
+        # Each rule outputs: f_i = p_i*x + q_i, final output = sum_i(w_norm_i * f_i)
+        # Regrouped as (sum_i w_i p_i) . x + sum_i w_i q_i so the per-rule outputs
+        # (batch, n_rules) are never materialized:
+        # w_norm: (batch, n_rules), weights: (n_rules, n_inputs) -> wx: (batch, n_inputs)
+        wx = torch.mm(w_norm, self.consequent_weights)
+        # bias: (n_rules) -> wb: (batch)
+        wb = torch.mv(w_norm, self.consequent_bias)
+
+        output = torch.sum(wx * x, dim=1, keepdim=True) + wb.unsqueeze(1)
         
         return output
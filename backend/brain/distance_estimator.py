@@ -13,6 +13,12 @@ Camera Specifications (Logitech C270):
 """
 
 import math
+import logging
+from functools import lru_cache
+
+import numpy as np
+
+log = logging.getLogger(__name__)
 
 
 # Camera Configuration (External Webcam at 1280x720)
@@ -75,9 +81,11 @@ def calculate_distance(focal_length, known_width_cm, pixel_width):
     return round(distance_cm, 2)
 
 
+@lru_cache(maxsize=16)
 def estimate_focal_length_from_fov(fov_degrees, image_width_px):
     """
     Estimate focal length from camera field of view (FOV).
+    Memoized: the project only ever uses a handful of (FOV, width) pairs.
     
     Formula:
         focal_length = (image_width / 2) / tan(FOV / 2)
@@ -100,6 +108,10 @@ def estimate_focal_length_from_fov(fov_degrees, image_width_px):
     return round(focal_length, 2)
 
 
+# Fraction of the YOLO bbox width that is the object itself (see get_object_pixel_width)
+BBOX_SCALE_FACTOR = 0.53  # Use 53% of detected bbox width
+
+
 def get_object_pixel_width(bbox):
     """
     Extract pixel width from bounding box.
@@ -125,8 +137,6 @@ def get_object_pixel_width(bbox):
     
     # Apply scaling factor to compensate for bbox padding
     # This factor was determined empirically from calibration data
-    BBOX_SCALE_FACTOR = 0.53  # Use 53% of detected bbox width
-    
     adjusted_width = int(raw_width * BBOX_SCALE_FACTOR)
     
     print(f"[DISTANCE-DEBUG]   Raw BBox Width: {raw_width}px → Adjusted: {adjusted_width}px (×{BBOX_SCALE_FACTOR})")
@@ -224,6 +234,79 @@ def estimate_distance_from_detection(detection, focal_length=FOCAL_LENGTH_DEFAUL
     return distance
 
 
+def build_known_width_lut(class_names):
+    """
+    Known widths indexed by detector class id, built once per model vocabulary.
+    
+    Args:
+        class_names (dict or list): Class id -> name (YOLO's model.names)
+    
+    Returns:
+        np.ndarray: (num_classes,) widths in cm, NaN for classes without a known width
+    """
+    items = class_names.items() if isinstance(class_names, dict) else enumerate(class_names)
+    items = [(int(class_id), str(name).lower()) for class_id, name in items]
+    lut = np.full(max((class_id for class_id, _ in items), default=-1) + 1, np.nan)
+    for class_id, name in items:
+        lut[class_id] = KNOWN_OBJECT_WIDTHS.get(name, np.nan)
+    return lut
+
+
+def estimate_distances_batch(detections, focal_length=FOCAL_LENGTH_DEFAULT, width_lut=None, subpixel=False):
+    """
+    Vectorized estimate_distance_from_detection() for all detections of a frame.
+    
+    Args:
+        detections (list): Detection dicts with 'object_name' and 'bbox' keys
+        focal_length (float): Camera focal length in pixels
+        width_lut (np.ndarray): Optional build_known_width_lut() table; detections
+                                must then carry 'class_id' (falls back to names if
+                                an id is outside the table, e.g. mid vocabulary change)
+        subpixel (bool): Use the float 'bbox_f' edges where present and skip the
+                         integer truncation of the adjusted width, so the estimate
+                         doesn't jump by ~1% whenever an edge crosses a pixel
+    
+    Returns:
+        np.ndarray: (N,) distances in cm rounded to 0.01, -1 where the object is
+                    unknown, the bbox is missing or its adjusted width is below 1 px
+    """
+    n = len(detections)
+    if n == 0:
+        return np.empty(0)
+    
+    known_widths = None
+    if width_lut is not None:
+        class_ids = np.fromiter((d['class_id'] for d in detections), dtype=np.intp, count=n)
+        if class_ids.min() >= 0 and class_ids.max() < len(width_lut):
+            known_widths = width_lut[class_ids]
+            known_widths[[not d.get('bbox') for d in detections]] = np.nan
+    if known_widths is None:
+        known_widths = np.fromiter(
+            (KNOWN_OBJECT_WIDTHS.get(d.get('object_name', '').lower(), np.nan) if d.get('bbox') else np.nan
+             for d in detections),
+            dtype=np.float64, count=n)
+    if subpixel:
+        bboxes = [d.get('bbox_f') or d.get('bbox') or (0, 0, 0, 0) for d in detections]
+    else:
+        bboxes = [d.get('bbox') or (0, 0, 0, 0) for d in detections]
+    bboxes = np.array(bboxes, dtype=np.float64).reshape(n, 4)
+    
+    pixel_widths = np.abs(bboxes[:, 2] - bboxes[:, 0]) * BBOX_SCALE_FACTOR
+    if not subpixel:
+        # Same truncation as get_object_pixel_width()
+        pixel_widths = np.floor(pixel_widths)
+    
+    # >= 1 px is the same as the truncated width being > 0
+    valid = ~np.isnan(known_widths) & (pixel_widths >= 1)
+    distances = np.full(n, -1.0)
+    raw = known_widths[valid] * focal_length / pixel_widths[valid]
+    # Python's round() (correctly rounded), not np.round, to match calculate_distance() exactly
+    distances[valid] = [round(d, 2) for d in raw.tolist()]
+    
+    log.debug("[DISTANCE-DEBUG] widths=%s px=%s -> %s cm", known_widths, pixel_widths, distances)
+    return distances
+
+
 if __name__ == "__main__":
     # Test the distance estimation
     print("=" * 60)
@@ -1,4 +1,5 @@
 import math
+from functools import lru_cache
 
 # Link lengths in cm (Updated to match visual_ik_solver user-confirmed values)
 LINK_1 = 10.0  # Base to Shoulder (approx 10cm pedestal)
@@ -6,6 +7,15 @@ LINK_2 = 15.0  # Shoulder to Elbow (L1 in visual_ik)
 LINK_3 = 13.0  # Elbow to Wrist (L2 in visual_ik)
 LINK_4 = 12.0  # Wrist to Gripper TIP (Gripper Length in visual_ik)
 
+# Law-of-cosines terms for the shoulder/elbow pair, computed once
+_L2_SQ = LINK_2 ** 2
+_L3_SQ = LINK_3 ** 2
+_L2_SQ_PLUS_L3_SQ = _L2_SQ + _L3_SQ
+_TWO_L2 = 2 * LINK_2
+_TWO_L2_L3 = _TWO_L2 * LINK_3
+_REACH_MAX = LINK_2 + LINK_3  # Max shoulder-to-wrist distance
+_REACH_MAX_SQ = _REACH_MAX ** 2
+
 def normalize_angle(angle):
     """
     Normalize any angle to 0-180 range for servo compatibility.
@@ -64,16 +74,17 @@ def solve_angles(x, y, z, pitch=0, roll=0):
     # z_eff is the height of wrist center relative to the shoulder pivot
     z_eff = zc - LINK_1
     
-    # Distance from shoulder pivot to wrist center
-    D = math.sqrt(r**2 + z_eff**2)
-    
-    # Check if target is reachable
-    if D > (LINK_2 + LINK_3):
+    # Check if target is reachable (squared distance, so rejects skip the sqrt)
+    D_sq = r**2 + z_eff**2
+    if D_sq > _REACH_MAX_SQ:
         raise ValueError("Target out of reach")
+    
+    # Distance from shoulder pivot to wrist center
+    D = math.sqrt(D_sq)
         
     # Law of Cosines to find angles
     # Angle at Elbow (internal)
-    cos_theta3 = (LINK_2**2 + LINK_3**2 - D**2) / (2 * LINK_2 * LINK_3)
+    cos_theta3 = (_L2_SQ_PLUS_L3_SQ - D**2) / _TWO_L2_L3
     # Clamp value for stability
     cos_theta3 = max(-1.0, min(1.0, cos_theta3))
     theta3_rad = math.acos(cos_theta3)
@@ -82,7 +93,7 @@ def solve_angles(x, y, z, pitch=0, roll=0):
     # alpha is angle of the line D to the horizon
     alpha = math.atan2(z_eff, r)
     # beta is angle between line D and LINK_2
-    cos_beta = (LINK_2**2 + D**2 - LINK_3**2) / (2 * LINK_2 * D)
+    cos_beta = (_L2_SQ + D**2 - _L3_SQ) / (_TWO_L2 * D)
     cos_beta = max(-1.0, min(1.0, cos_beta))
     beta = math.acos(cos_beta)
     
@@ -132,14 +143,21 @@ def compute_forward_kinematics(angles):
     Computes the forward kinematics to get XYZ position from 6 servo angles.
     Takes servo angles [base, shoulder, elbow, wrist_pitch, wrist_roll, gripper]
     Returns (x, y, z) position in mm of the end effector.
+    Results are memoized on the first four angles (rounded to 0.01 deg), so an
+    idle arm polled by the UI costs a dict lookup.
     """
-    # Extract angles and convert to radians
-    theta1 = math.radians(angles[0])  # Base rotation
-    theta2 = math.radians(angles[1])  # Shoulder angle
-    theta3 = math.radians(angles[2])  # Elbow angle
-    theta4 = math.radians(angles[3])  # Wrist pitch
     # angles[4] is wrist roll (doesn't affect XYZ position)
     # angles[5] is gripper (doesn't affect XYZ position)
+    return _forward_kinematics_cached(round(float(angles[0]), 2), round(float(angles[1]), 2),
+                                      round(float(angles[2]), 2), round(float(angles[3]), 2))
+
+@lru_cache(maxsize=256)
+def _forward_kinematics_cached(base, shoulder, elbow, wrist_pitch):
+    # Extract angles and convert to radians
+    theta1 = math.radians(base)         # Base rotation
+    theta2 = math.radians(shoulder)     # Shoulder angle
+    theta3 = math.radians(elbow)        # Elbow angle
+    theta4 = math.radians(wrist_pitch)  # Wrist pitch
     
     # Calculate position of each joint in 3D space
     # Starting from base and working up to end effector
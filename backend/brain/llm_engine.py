@@ -1,14 +1,36 @@
 import os
 import json
+import copy
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from groq import Groq
 from dotenv import load_dotenv
 
+try:
+    import orjson  # Optional: faster JSON for the prompt, cache key and reply parsing
+except ImportError:
+    orjson = None
+
 load_dotenv()
 
+# Seconds before a Groq request is abandoned (the SDK default is 60s).
+# No retries, so this is also the worst case a caller waits on the future.
+LLM_TIMEOUT = 15.0
+# Upper bound on concurrent in-flight LLM requests
+LLM_MAX_CONCURRENCY = 4
+# Generation cap: a plan is a ~60-120 token JSON object, so this only bounds
+# the worst case (a rambling reply) instead of the model's full context
+LLM_MAX_TOKENS = 256
+
 # Initialize Groq Client
 try:
     client = Groq(
         api_key=os.environ.get("GROQ_API_KEY"),
+        timeout=LLM_TIMEOUT,
+        max_retries=0,
     )
 except Exception as e:
     print(f"Error initializing Groq client: {e}")
@@ -64,11 +86,74 @@ Return a JSON object with this structure:
    {"intent": "EXTEND", "target_object": null, "params": {"angle": 15}, "reply": "Extending arm 15 degrees."}
 """
 
+# --- RESPONSE CACHE ---
+# The same command against the same set of objects yields the same plan (low
+# temperature, JSON mode), so repeats within LLM_CACHE_TTL seconds skip the
+# network round-trip.
+LLM_CACHE_TTL = 60.0
+LLM_CACHE_MAX_ENTRIES = 256
+# Commands containing these words may expect a different answer each time
+VOLATILE_WORDS = {"now", "again", "random", "randomly", "surprise"}
+
+_response_cache = OrderedDict()  # key -> (timestamp, parsed_response)
+_cache_lock = threading.Lock()
+
+def _dumps_vision_state(vision_state):
+    """Vision state as JSON bytes (orjson when installed; numpy scalars allowed)."""
+    if orjson is not None:
+        return orjson.dumps(vision_state, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(vision_state).encode('utf-8')
+
+def _cache_key(user_text, vision_state):
+    """
+    64-bit blake2b digest of the command and the names of the objects in view.
+    The plan is an intent classification, so per-pass coordinates (which move
+    with every pixel of bbox jitter) are deliberately left out of the key.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    h.update(user_text.strip().lower().encode('utf-8'))
+    for name in sorted(vision_state):
+        h.update(b'\0')
+        h.update(name.encode('utf-8'))
+    return h.digest()
+
+def _is_cacheable(user_text):
+    words = {w.strip('.,!?"\'') for w in user_text.lower().split()}
+    return not (words & VOLATILE_WORDS)
+
+def _cache_get(key):
+    with _cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        timestamp, response = entry
+        if time.time() - timestamp > LLM_CACHE_TTL:
+            del _response_cache[key]
+            return None
+        _response_cache.move_to_end(key)
+        return copy.deepcopy(response)
+
+def _cache_put(key, response):
+    with _cache_lock:
+        _response_cache[key] = (time.time(), copy.deepcopy(response))
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > LLM_CACHE_MAX_ENTRIES:
+            _response_cache.popitem(last=False)
+
 def process_command(user_text, vision_state):
     """
     Sends the user command and current vision state to the Groq API.
     Returns the parsed JSON plan and reply.
+    Successful responses are cached for LLM_CACHE_TTL seconds per (command, objects in view).
     """
+    cache_key = None
+    if _is_cacheable(user_text):
+        cache_key = _cache_key(user_text, vision_state)
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            print(f"[LLM] Cache hit for: '{user_text}'")
+            return cached
+
     if not client:
         return {
             "plan": [],
@@ -78,7 +163,7 @@ def process_command(user_text, vision_state):
     # Construct the user message
     user_message = f"""
     Command: "{user_text}"
-    Vision State: {json.dumps(vision_state)}
+    Vision State: {_dumps_vision_state(vision_state).decode('utf-8')}
     """
 
     try:
@@ -95,6 +180,7 @@ def process_command(user_text, vision_state):
             ],
             model="llama-3.3-70b-versatile",
             temperature=0.1,
+            max_tokens=LLM_MAX_TOKENS,
             response_format={"type": "json_object"},
         )
 
@@ -102,7 +188,10 @@ def process_command(user_text, vision_state):
         
         # Parse the JSON response
         try:
-            parsed_response = json.loads(response_content)
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError
+            parsed_response = orjson.loads(response_content) if orjson is not None else json.loads(response_content)
+            if cache_key is not None:
+                _cache_put(cache_key, parsed_response)
             return parsed_response
         except json.JSONDecodeError:
             print(f"Failed to parse JSON from LLM: {response_content}")
@@ -117,3 +206,16 @@ def process_command(user_text, vision_state):
             "plan": [],
             "reply": f"Error processing command: {str(e)}"
         }
+
+
+# --- NON-BLOCKING ENTRY POINT ---
+_llm_executor = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY, thread_name_prefix="llm")
+
+def process_command_async(user_text, vision_state):
+    """
+    Submit process_command() to the bounded LLM pool.
+
+    Returns:
+        concurrent.futures.Future: Resolves to the same dict as process_command()
+    """
+    return _llm_executor.submit(process_command, user_text, vision_state)
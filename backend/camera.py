@@ -1,21 +1,112 @@
 import cv2
 import threading
 import time
+import queue
+import itertools
+import sys
+import logging
 import numpy as np
 from coordinate_mapper import CoordinateMapper
 from yolo_detector import YOLODetector
 from brain.distance_estimator import (
-    estimate_distance_from_detection,
+    estimate_distances_batch,
     get_object_pixel_width,
     FOCAL_LENGTH_DEFAULT,
     KNOWN_OBJECT_WIDTHS
 )
 from brain.visual_ik_solver import GRIPPER_LENGTH
 from hybrid_tracker import HybridTracker
+from color_mask import build_range_table, color_mask
+from jpeg_encoder import encode_jpeg
+from frame_drawing import copy_into, TextSprite
+from thread_priority import boost_current_thread
 import os
 
+log = logging.getLogger(__name__)
+
+# Optional GStreamer capture (Linux, OpenCV built with GStreamer): set
+# CAMERA_GSTREAMER=1 to use this pipeline, or CAMERA_PIPELINE to supply your own.
+# The camera's MJPEG is decoded by GStreamer (swap jpegdec for a hardware decoder
+# such as nvjpegdec / v4l2jpegdec where available) and appsink keeps only the
+# newest frame, so read() never returns a stale buffered one.
+GSTREAMER_PIPELINE = (
+    "v4l2src device=/dev/video{index} ! image/jpeg,width=1280,height=720,framerate=30/1 ! "
+    "jpegdec ! videoconvert ! video/x-raw,format=BGR ! appsink drop=1 max-buffers=1 sync=false"
+)
+
+# With detect_on_demand, detection keeps running this long after the last
+# request_detections() call (pollers, LLM commands)
+DETECTION_IDLE_TIMEOUT = 5.0
+
+# Minimum blob area (full-resolution pixels) for color detections
+COLOR_MIN_CONTOUR_AREA = 500
+
+# Drawing colors (BGR) for color-detection mode
+COLOR_BOX_BGR = {
+    "Red": (0, 0, 255),
+    "Blue": (255, 0, 0),
+    "Green": (0, 255, 0),
+    "Yellow": (0, 255, 255)
+}
+
+# Static-scene detection: frames whose 64x36 thumbnail is within THUMB_TOLERANCE
+# of the last rendered frame's (every cell, every channel) reuse its JPEG instead
+# of being re-encoded. Each cell averages a 20x20 block of a 720p frame, so sensor
+# noise moves it by ~1 level while a 10px object moves it by tens
+THUMB_SIZE = (64, 36)
+THUMB_TOLERANCE = 8
+
+# Static mode labels for the display frame
+LABEL_YOLO_PAUSED = TextSprite("YOLO PAUSED", (10, 30), (0, 255, 255))
+LABEL_MODE_YOLO = TextSprite("Mode: YOLO-World", (10, 30), (0, 255, 0))
+LABEL_MODE_COLOR = TextSprite("Mode: Color", (10, 30), (255, 255, 0))
+LABEL_MODE_IDLE = TextSprite("Mode: Idle", (10, 30), (0, 255, 255))
+
+def frame_thumbnail(image):
+    """Block-averaged thumbnail of `image` for thumbnails_match()."""
+    return cv2.resize(image, THUMB_SIZE, interpolation=cv2.INTER_AREA)
+
+def thumbnails_match(a, b):
+    """True if no thumbnail cell differs by more than THUMB_TOLERANCE."""
+    return a.shape == b.shape and int(cv2.absdiff(a, b).max()) <= THUMB_TOLERANCE
+
+def overlay_key(detections):
+    """
+    Hashable summary of what the overlays draw for `detections`, at the precision
+    they are drawn with. Unlike detection_version, it stays the same across
+    detection passes that find the same thing.
+    """
+    return tuple(
+        (det.get('object_name'), det.get('color'), tuple(det.get('bbox') or ()),
+         tuple(det.get('center') or ()), round(det.get('confidence', 0), 2),
+         det.get('x'), det.get('y'), det.get('error_x'), det.get('error_y'),
+         det.get('is_centered'), round(det.get('distance_cm', -1), 1))
+        for det in detections)
+
+# object_name -> LLM vision-state key ("cell phone" -> "cell_phone"), interned once per class
+_VISION_KEYS = {}
+
+def vision_key(object_name):
+    """Vision-state key for a detected class name (cached)."""
+    key = _VISION_KEYS.get(object_name)
+    if key is None:
+        key = sys.intern(object_name.lower().replace(' ', '_'))
+        _VISION_KEYS[object_name] = key
+    return key
+
+def build_vision_state(detections):
+    """
+    Build the {object_key: [cm_x, cm_y, 0]} dict sent to the LLM.
+    Detections without an object_name (color mode) are skipped.
+    """
+    return {
+        vision_key(obj['object_name']): [obj.get('cm_x', 0), obj.get('cm_y', 0), 0]
+        for obj in detections if 'object_name' in obj
+    }
+
 class VideoCamera(object):
-    def __init__(self, detection_mode='yolo', center_tolerance=25, focal_length_override=None):
+    def __init__(self, detection_mode='yolo', center_tolerance=25, focal_length_override=None,
+                 detect_on_demand=False):
         """
         Initialize VideoCamera.
         
@@ -23,7 +114,16 @@ class VideoCamera(object):
             detection_mode: 'yolo' for object detection or 'color' for color-based detection
             center_tolerance: Pixel tolerance for "centered" alignment (default: 25)
             focal_length_override: Override focal length (pixels) for calibration (default: None uses 1424)
+            detect_on_demand: Only run detection while a consumer is registered with
+                add_detection_consumer() or request_detections() was called
+                recently (default: always detect)
         """
+        # Detection demand tracking (see add/remove_detection_consumer, request_detections)
+        self.detect_on_demand = detect_on_demand
+        self._detection_consumers = 0
+        self._consumers_lock = threading.Lock()
+        self._detection_demand = threading.Event()
+        self._last_detection_request = time.time()
         # Default objects to detect (General Workplace Items)
         self.DEFAULT_CLASSES = [
             "person", "bottle", "cup", "cell phone", "mouse", "keyboard", 
@@ -42,6 +142,8 @@ class VideoCamera(object):
         ]
         
         self.video = None
+        # Cached capture state for status polling (avoids an OpenCV call per request)
+        self.is_open = False
         self._open_camera()
             
         
@@ -63,6 +165,11 @@ class VideoCamera(object):
         self.target_object = None  # Target object name for filtering (e.g., "bottle")
         self.center_tolerance = center_tolerance  # Pixels within which object is "centered"
         
+        # Detections are published as one (version, list, vision_state) tuple so
+        # readers never see mismatched values (see last_detection property)
+        self._detection_versions = itertools.count(1)
+        self._detection_state = (0, [], {})
+        self.detection_changed = threading.Condition()  # Notified on every new detection pass
         self.last_detection = [] # Stores list of all detections
         self.mapper = None # Initialize mapper lazily when we have frame dimensions
         
@@ -92,17 +199,27 @@ class VideoCamera(object):
                 (np.array([20, 100, 100]), np.array([30, 255, 255]))
             ]
         }
+        # (colors, los, his, bits) for the fused mask, rebuilt only when targets change
+        self._color_table = self._build_color_table(self.target_colors)
         
         # Threading support
         self.lock = threading.Lock()
         self.raw_frame = None
         self.processed_jpeg = None
+        
+        # Latest-frame slots: written by the capture thread, read by HTTP handlers.
+        # Readers only take the lock long enough to grab a reference.
+        self.frame_lock = threading.RLock()
+        self.frame_ready = threading.Condition(self.frame_lock)
+        self.frame_seq = 0  # Incremented on every published JPEG
+        self.raw_frame_ready = threading.Condition(self.frame_lock)
+        self.raw_seq = 0  # Incremented on every captured frame
         self.stopped = False
         self.pause_yolo = False  # Flag to pause YOLO processing
         
-        # Frame containers for async inference
-        self.latest_frame_for_inference = None
-        self.inference_lock = threading.Lock()
+        # 1-slot hand-off from capture to encoder (stale frames are dropped)
+        self.encode_queue = queue.Queue(maxsize=1)
+        self._display_buffer = None  # Encoder-thread scratch frame for overlays
         
         # Hybrid Tracker for Blind Spot handling (<15cm)
         self.hybrid_tracker = HybridTracker()
@@ -110,39 +227,102 @@ class VideoCamera(object):
         self.hybrid_mode_active = False
         print("[INFO] Hybrid Tracker initialized for <15cm blind spot handling.")
         
+        # Pay model/encoder cold-start cost now, before the inference thread
+        # starts calling the model (ultralytics models are not thread-safe)
+        self.warmup()
+        
         # Start background capture thread
         print("[INFO] Starting background capture thread...")
         self.thread = threading.Thread(target=self._capture_loop, daemon=True)
         self.thread.start()
 
+        # Start background ENCODER thread (overlay drawing + JPEG encode)
+        print("[INFO] Starting background encoder thread...")
+        self.encoder_thread = threading.Thread(target=self._encode_loop, daemon=True)
+        self.encoder_thread.start()
+
         # Start background INFERENCE thread (Decoupled to prevent video freeze)
         print("[INFO] Starting background inference thread...")
         self.inference_thread = threading.Thread(target=self._inference_loop, daemon=True)
         self.inference_thread.start()
 
+    def add_detection_consumer(self):
+        """Register a detection consumer (video stream, servoing loop). Pair with remove_detection_consumer()."""
+        with self._consumers_lock:
+            self._detection_consumers += 1
+        self._detection_demand.set()
+
+    def remove_detection_consumer(self):
+        """Unregister a consumer added with add_detection_consumer()."""
+        with self._consumers_lock:
+            self._detection_consumers = max(0, self._detection_consumers - 1)
+
+    def request_detections(self):
+        """Keep detection running for DETECTION_IDLE_TIMEOUT seconds (for one-off readers)."""
+        # Under detection_changed so it can't interleave with _clear_idle_detections()
+        with self.detection_changed:
+            self._last_detection_request = time.time()
+        self._detection_demand.set()
+
+    def _clear_idle_detections(self):
+        """
+        Drop the last pass when detection goes idle, so the overlay, /snapshot
+        and pollers don't keep serving boxes for a scene nobody is watching.
+        """
+        with self.detection_changed:
+            if not self.detection_active and self.last_detection:
+                self.last_detection = []
+
+    @property
+    def detection_active(self):
+        """False only when detect_on_demand is on and nobody needs detections."""
+        return (not self.detect_on_demand
+                or self._detection_consumers > 0
+                or time.time() - self._last_detection_request < DETECTION_IDLE_TIMEOUT)
+
+    def warmup(self, n=3, shape=(720, 1280, 3)):
+        """Run dummy YOLO passes and a dummy JPEG encode so the first real frame is at steady-state latency."""
+        try:
+            if self.yolo_detector:
+                self.yolo_detector.warmup(n=n, shape=shape)
+            encode_jpeg(np.zeros(shape, dtype=np.uint8))
+        except Exception as e:
+            print(f"[WARN] Warm-up failed (continuing): {e}")
+
     def _inference_loop(self):
         """
         Dedicated thread for YOLO inference.
         Runs as fast as possible but doesn't block the video feed.
         """
         print("[INFO] Inference thread started.")
+        boost_current_thread("Inference", cpus_env="DETECTION_CPUS")
         inference_counter = 0
+        last_seq = 0
+        idle = False
         while not self.stopped:
             try:
                 # Check if paused (e.g. mimic mode)
                 if self.pause_yolo:
                     time.sleep(0.1)
                     continue
-
-                # Get latest available frame
-                frame_to_process = None
-                with self.inference_lock:
-                    if self.latest_frame_for_inference is not None:
-                         frame_to_process = self.latest_frame_for_inference.copy()
                 
-                if frame_to_process is None:
-                    time.sleep(0.01)
+                # Nobody is consuming detections: leave the GPU idle until someone is
+                if not self.detection_active:
+                    if not idle:
+                        self._clear_idle_detections()
+                        idle = True
+                    self._detection_demand.clear()
+                    self._detection_demand.wait(0.5)
                     continue
+                idle = False
+
+                # Wait for a frame we have not run inference on yet, so a model
+                # faster than the camera never re-detects the same image
+                seq, frame = self.wait_for_raw_frame(last_seq, timeout=0.5)
+                if seq == last_seq or frame is None:
+                    continue
+                last_seq = seq
+                frame_to_process = frame.copy()  # find_objects_yolo draws on it
                 
                 # Heartbeat every 50 frames
                 inference_counter += 1
@@ -155,9 +335,6 @@ class VideoCamera(object):
                 elif self.target_colors:
                         self.find_objects(frame_to_process) # Updates self.last_detection internal state
                 
-                # Yield to CPU
-                time.sleep(0.01)
-
             except Exception as e:
                 print(f"[ERROR] CRITICAL INFERENCE LOOP ERROR: {e}")
                 import traceback
@@ -166,8 +343,8 @@ class VideoCamera(object):
 
     def _capture_loop(self):
         """
-        Background thread to continuously read and process frames.
-        Ensures thread-safety and consistent FPS for all consumers.
+        Background thread to continuously read frames.
+        Only does camera I/O; drawing and JPEG encoding happen in _encode_loop.
         """
         consecutive_failures = 0
         self.last_frame_time = time.time()
@@ -183,6 +360,7 @@ class VideoCamera(object):
             
             # Check if camera needs opening
             if self.video is None or not self.video.isOpened():
+                self.is_open = False
                 print("[CAMERA] Camera disconnected or released. Attempting to reconnect...")
                 if self._open_camera():
                      consecutive_failures = 0
@@ -200,6 +378,7 @@ class VideoCamera(object):
                     consecutive_failures += 1
                     if consecutive_failures > 10:
                         print("[CAMERA] Too many read errors. Re-initializing...")
+                        self.is_open = False
                         self.video.release() # Force close to trigger full reopen
                         consecutive_failures = 0
                     time.sleep(0.01)
@@ -207,68 +386,19 @@ class VideoCamera(object):
                 
                 consecutive_failures = 0 # Reset on success
                     
-                # Store raw frame
-                self.raw_frame = image.copy()
-                
-                # Update frame for inference thread
-                with self.inference_lock:
-                    self.latest_frame_for_inference = image.copy()
-                
-                # Skip YOLO processing if paused (e.g., during mimic mode)
-                if self.pause_yolo:
-                    # Just show raw frame with "YOLO PAUSED" text
-                    display_frame = image.copy()
-                    cv2.putText(display_frame, "YOLO PAUSED", (10, 30),
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-                    ret, jpeg = cv2.imencode('.jpg', display_frame)
-                    if ret:
-                        self.processed_jpeg = jpeg.tobytes()
-                    time.sleep(0.01)
-                    continue
-                
-                # Prepare display frame
-                display_frame = image.copy()
-                height, width, _ = display_frame.shape
-                cx, cy = width // 2, height // 2
-                
-                # Simple visual guides (always present)
-                cv2.line(display_frame, (cx - 20, cy), (cx + 20, cy), (200, 200, 200), 1)
-                cv2.line(display_frame, (cx, cy - 20), (cx, cy + 20), (200, 200, 200), 1)
-                
-                # DRAW LATEST DETECTIONS (Non-blocking)
-                # Use self.last_detection which is updated by the inference thread
-                if self.detection_mode == 'yolo' and self.yolo_detector:
-                    cv2.putText(display_frame, "Mode: YOLO-World", (10, 30), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                    
-                    if self.last_detection:
-                        self.yolo_detector.draw_detections(display_frame, self.last_detection)
-                        
-                    # Add Center-seeking visuals
-                    if self.target_object and self.last_detection:
-                        self._draw_overlay(display_frame)
-
-                elif self.target_colors:
-                    cv2.putText(display_frame, "Mode: Color", (10, 30), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
-                    if self.last_detection:
-                        for det in self.last_detection:
-                            if 'cm_x' in det: 
-                                obj_x = int(cx + det['x'])
-                                obj_y = int(cy - det['y']) 
-                                
-                                cv2.circle(display_frame, (obj_x, obj_y), 30, (0, 255, 0), 2)
-                                cv2.putText(display_frame, det.get('color', 'Target'), (obj_x, obj_y - 40), 
-                                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0,255,0), 2)
-
-                else:
-                    cv2.putText(display_frame, "Mode: Idle", (10, 30), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+                # Store raw frame (read() returns a fresh array and we only
+                # ever draw on copies, so consumers can share it)
+                with self.raw_frame_ready:
+                    self.raw_frame = image
+                    self.raw_seq += 1
+                    self.raw_frame_ready.notify_all()
                 
-                # Encode result to JPEG
-                ret, jpeg = cv2.imencode('.jpg', display_frame)
-                if ret:
-                    self.processed_jpeg = jpeg.tobytes()
+                # Hand off to the encoder thread, replacing any frame it has not picked up yet
+                try:
+                    self.encode_queue.get_nowait()
+                except queue.Empty:
+                    pass
+                self.encode_queue.put_nowait(image)
                     
                 # Small yield to prevent CPU hogging if capture is uncapped
                 time.sleep(0.01)
@@ -279,6 +409,95 @@ class VideoCamera(object):
                 traceback.print_exc()
                 time.sleep(1)
 
+    def _encode_loop(self):
+        """
+        Dedicated thread for drawing overlays and JPEG-encoding display frames.
+        Pipelines capture || encode || serve, so a slow encode never delays read()
+        and every client reuses the one encoded buffer.
+        """
+        print("[INFO] Encoder thread started.")
+        last_key = None
+        last_thumb = None
+        last_jpeg = None
+        while not self.stopped:
+            try:
+                image = self.encode_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            
+            try:
+                # Overlays only change with what the detections draw and the mode,
+                # so that state plus a near-identical raw frame means the same output
+                key = (overlay_key(self.last_detection), self.detection_mode,
+                       self.pause_yolo, self.target_object, tuple(self.target_colors))
+                thumb = frame_thumbnail(image)
+                if key == last_key and last_jpeg is not None and thumbnails_match(thumb, last_thumb):
+                    # Static scene: re-publish the previous JPEG, skip draw + encode.
+                    # last_thumb stays the rendered frame's, so slow drift still re-renders
+                    self._publish_jpeg(last_jpeg)
+                    continue
+
+                display_frame = self._render_display_frame(image)
+                jpeg = encode_jpeg(display_frame)
+                if jpeg is not None:
+                    last_key, last_thumb, last_jpeg = key, thumb, jpeg
+                    self._publish_jpeg(jpeg)
+            except Exception as e:
+                print(f"[ERROR] ENCODER LOOP ERROR: {e}")
+                import traceback
+                traceback.print_exc()
+                time.sleep(1)
+
+    def _render_display_frame(self, image):
+        """
+        Returns a copy of `image` with mode text and the latest detections drawn on it.
+        The copy lives in a scratch buffer reused by the next call (encoder thread only).
+        """
+        # Skip YOLO overlays if paused (e.g., during mimic mode)
+        if self.pause_yolo:
+            # Just show raw frame with "YOLO PAUSED" text
+            display_frame = self._display_buffer = copy_into(self._display_buffer, image)
+            LABEL_YOLO_PAUSED.draw(display_frame)
+            return display_frame
+        
+        # Prepare display frame
+        display_frame = self._display_buffer = copy_into(self._display_buffer, image)
+        height, width, _ = display_frame.shape
+        cx, cy = width // 2, height // 2
+
+        # Simple visual guides (always present)
+        cv2.line(display_frame, (cx - 20, cy), (cx + 20, cy), (200, 200, 200), 1)
+        cv2.line(display_frame, (cx, cy - 20), (cx, cy + 20), (200, 200, 200), 1)
+
+        # DRAW LATEST DETECTIONS (Non-blocking)
+        # Use self.last_detection which is updated by the inference thread
+        if self.detection_mode == 'yolo' and self.yolo_detector:
+            LABEL_MODE_YOLO.draw(display_frame)
+
+            if self.last_detection:
+                self.yolo_detector.draw_detections(display_frame, self.last_detection)
+
+            # Add Center-seeking visuals
+            if self.target_object and self.last_detection:
+                self._draw_overlay(display_frame)
+
+        elif self.target_colors:
+            LABEL_MODE_COLOR.draw(display_frame)
+            if self.last_detection:
+                for det in self.last_detection:
+                    if 'cm_x' in det: 
+                        obj_x = int(cx + det['x'])
+                        obj_y = int(cy - det['y']) 
+
+                        cv2.circle(display_frame, (obj_x, obj_y), 30, (0, 255, 0), 2)
+                        cv2.putText(display_frame, det.get('color', 'Target'), (obj_x, obj_y - 40), 
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0,255,0), 2)
+
+        else:
+            LABEL_MODE_IDLE.draw(display_frame)
+        
+        return display_frame
+
     def _draw_overlay(self, frame):
         """Helper to draw overlay graphics on the display frame"""
         height, width, _ = frame.shape
@@ -356,6 +575,7 @@ class VideoCamera(object):
                      if self.video: self.video.release()
                 except:
                      pass
+                self.is_open = False
                 self.video = None # This will trigger _capture_loop to reconnect
 
     def stop(self):
@@ -363,7 +583,9 @@ class VideoCamera(object):
         self.stopped = True
         if hasattr(self, 'thread'):
             self.thread.join(timeout=1.0)
-        self.video.release()
+        self.is_open = False
+        if self.video:
+            self.video.release()
     
     def set_detection_mode(self, mode):
         """
@@ -393,8 +615,11 @@ class VideoCamera(object):
         Args:
             object_name: Name of object to track (e.g., "bottle", "cup")
         """
-        self.target_object = object_name.lower() if object_name else None
-        self.last_detection = []  # Clear detections when target changes
+        # Under the detection lock so an in-flight pass for the old target
+        # can't publish after the clear (see _publish_for_target)
+        with self.detection_changed:
+            self.target_object = object_name.lower() if object_name else None
+            self.last_detection = []  # Clear detections when target changes
         
         # NOTE: We do NOT call set_classes dynamically because it breaks detection
         # Instead, we filter in software in find_objects_yolo
@@ -404,8 +629,9 @@ class VideoCamera(object):
         """
         Clear target object filter. Returns to detecting all objects.
         """
-        self.target_object = None
-        self.last_detection = []
+        with self.detection_changed:
+            self.target_object = None
+            self.last_detection = []
         
         # NOTE: Not resetting classes - detection always runs with full class set
         print(f"[INFO] Target object cleared - showing all objects")
@@ -421,9 +647,15 @@ class VideoCamera(object):
             # Filter to only valid colors
             self.target_colors = [c for c in color_names if c in self.color_ranges]
         
+        self._color_table = self._build_color_table(self.target_colors)
         self.last_detection = [] # Reset detection on new targets
         print(f"[INFO] Target colors set to: {self.target_colors}")
     
+    def _build_color_table(self, color_names):
+        """Precompute the contiguous HSV bounds for the given colors (one tuple, swapped atomically)."""
+        colors = tuple(c for c in color_names if c in self.color_ranges)
+        return (colors,) + build_range_table(self.color_ranges, colors)
+
     def find_objects_yolo(self, frame):
         """
         Find objects using YOLO detection with Hybrid Tracker handover at <15cm.
@@ -432,6 +664,10 @@ class VideoCamera(object):
         if self.yolo_detector is None:
             self.yolo_detector = YOLODetector(confidence_threshold=0.3)
         
+        # One read per pass: the whole pass filters for the same target even if
+        # set_target_object() runs concurrently
+        target_object = self.target_object
+        
         # Get frame dimensions
         height, width, _ = frame.shape
         frame_center_x = width // 2
@@ -447,7 +683,8 @@ class VideoCamera(object):
                 self.hybrid_mode_active = True
             
             # Use hybrid tracker (YOLO + CSRT fallback)
-            result = self.hybrid_tracker.get_target(frame, self.yolo_detector.model, target_class=self.target_object)
+            result = self.hybrid_tracker.get_target(frame, self.yolo_detector.model, target_class=target_object,
+                                                    half=self.yolo_detector.half)
             
             if result['source'] != 'NONE':
                 # Convert hybrid result to standard detection format
@@ -468,7 +705,7 @@ class VideoCamera(object):
                 
                 # Distance estimation from bbox (approximate)
                 # Use width-based estimation
-                obj_name = self.target_object if self.target_object else "bottle"
+                obj_name = target_object if target_object else "bottle"
                 if obj_name in self.known_object_widths:
                     real_width = self.known_object_widths[obj_name]
                     pixel_width = w
@@ -503,12 +740,12 @@ class VideoCamera(object):
                     'source': result['source']  # Track source
                 }]
                 
-                self.last_detection = new_detections
+                self._publish_for_target(new_detections, target_object)
                 return
             else:
                 # Even hybrid failed
                 print("[HYBRID] Tracker lost object too.")
-                self.last_detection = []
+                self._publish_for_target([], target_object)
                 return
         
         # --- STANDARD YOLO MODE (distance >= 15cm OR first detection) ---
@@ -518,13 +755,19 @@ class VideoCamera(object):
         
         detections = self.yolo_detector.detect_objects(frame)
         
-        # Filter by target_object if set
-        if self.target_object:
-            detections = [d for d in detections if d['object_name'].lower() == self.target_object]
+        # Filter by target_object if set (name resolved to class ids once per vocabulary)
+        if target_object:
+            target_ids = self.yolo_detector.class_ids_by_name.get(target_object, frozenset())
+            detections = [d for d in detections if d['class_id'] in target_ids]
+        
+        # Pinhole distances for the whole frame in one vectorized pass
+        distances = estimate_distances_batch(detections, self.focal_length,
+                                             width_lut=self.yolo_detector.known_width_lut,
+                                             subpixel=True)
         
         # Update results in a thread-safe way using a local list
         new_detections = []
-        for det in detections:
+        for det, distance_cm in zip(detections, distances.tolist()):
             # Calculate object center from bounding box
             bbox = det['bbox']
             object_center_x = (bbox[0] + bbox[2]) // 2
@@ -544,9 +787,6 @@ class VideoCamera(object):
             # Check if centered (within tolerance)
             is_centered = abs(error_x) <= self.center_tolerance and abs(error_y) <= self.center_tolerance
             
-            # Calculate distance using pinhole camera model
-            distance_cm = estimate_distance_from_detection(det, self.focal_length)
-            
             # If distance cannot be estimated (unknown object), set to -1
             if distance_cm == -1.0:
                 distance_cm = -1.0
@@ -581,7 +821,7 @@ class VideoCamera(object):
             })
         
         # Atomic swap
-        self.last_detection = new_detections
+        self._publish_for_target(new_detections, target_object)
         
         # Draw detections on frame (only target object if filter is active)
         frame = self.yolo_detector.draw_detections(frame, detections)
@@ -659,46 +899,53 @@ class VideoCamera(object):
             cv2.putText(frame, f"Target: {self.target_object}", (50, height - 150),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
         
-        # Print detection status
-        if self.last_detection:
-            count = len(self.last_detection)
-            if self.target_object:
-                det = self.last_detection[0]
-                if det['is_centered']:
-                    print(f"\r[ALIGNMENT] ✓ Target '{self.target_object}' is CENTERED!      ", end="")
-                else:
-                    # Calculate absolute offsets
-                    abs_error_x = abs(det['error_x'])
-                    abs_error_y = abs(det['error_y'])
+        # Console status ticker: formatted and printed only with LOGLEVEL=DEBUG
+        if log.isEnabledFor(logging.DEBUG):
+            if self.last_detection:
+                count = len(self.last_detection)
+                if self.target_object:
+                    det = self.last_detection[0]
+                    if det['is_centered']:
+                        print(f"\r[ALIGNMENT] ✓ Target '{self.target_object}' is CENTERED!      ", end="")
+                    else:
+                        # Calculate absolute offsets
+                        abs_error_x = abs(det['error_x'])
+                        abs_error_y = abs(det['error_y'])
                     
-                    # Determine directions for user-friendly navigation
-                    # error_x > 0 means object is LEFT of center → user should move camera/robot RIGHT
-                    # error_x < 0 means object is RIGHT of center → user should move camera/robot LEFT
-                    direction_x_text = "to the right" if det['error_x'] > 0 else "to the left"
-                    direction_y_text = "down" if det['error_y'] > 0 else "up"
+                        # Determine directions for user-friendly navigation
+                        # error_x > 0 means object is LEFT of center → user should move camera/robot RIGHT
+                        # error_x < 0 means object is RIGHT of center → user should move camera/robot LEFT
+                        direction_x_text = "to the right" if det['error_x'] > 0 else "to the left"
+                        direction_y_text = "down" if det['error_y'] > 0 else "up"
                     
-                    # Build navigation message
-                    nav_message = f"Target is {abs_error_x} pixels {direction_x_text}, {abs_error_y} pixels {direction_y_text}"
-                    print(f"\r[ALIGNMENT] {nav_message}      ", end="")
-            else:
-                objects = ', '.join([f"{d['object_name']}({d['confidence']:.2f})" for d in self.last_detection])
-                print(f"\r[YOLO] Found {count} object(s): {objects}      ", end="")
-        else:
-            if self.target_object:
-                print(f"\r[YOLO] Searching for '{self.target_object}'...      ", end="")
+                        # Build navigation message
+                        nav_message = f"Target is {abs_error_x} pixels {direction_x_text}, {abs_error_y} pixels {direction_y_text}"
+                        print(f"\r[ALIGNMENT] {nav_message}      ", end="")
+                else:
+                    objects = ', '.join([f"{d['object_name']}({d['confidence']:.2f})" for d in self.last_detection])
+                    print(f"\r[YOLO] Found {count} object(s): {objects}      ", end="")
             else:
-                print(f"\r[YOLO] Searching for objects...      ", end="")
+                if self.target_object:
+                    print(f"\r[YOLO] Searching for '{self.target_object}'...      ", end="")
+                else:
+                    print(f"\r[YOLO] Searching for objects...      ", end="")
         
         return frame
 
     def find_objects(self, frame):
         """
         Find all objects for all target colors.
+        Masking runs on a half-resolution copy (4x fewer pixels); coordinates
+        are scaled back to full resolution before being reported or drawn.
         """
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
         height, width, _ = frame.shape
         center_x, center_y = width // 2, height // 2
         
+        small = cv2.pyrDown(frame)
+        scale = width / small.shape[1]
+        hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+        min_area = COLOR_MIN_CONTOUR_AREA / (scale * scale)
+        
         # Initialize mapper if not already done
         if self.mapper is None:
             self.mapper = CoordinateMapper(width, height)
@@ -706,28 +953,32 @@ class VideoCamera(object):
         # Reset detection list (local for thread-safety)
         new_detections = []
         
+        # One fused pass over the HSV image tests every target color range
+        # (Red's two hue ranges set the same bit). Bounds are precomputed in
+        # set_target_colors, so no arrays are built per frame.
+        target_colors, los, his, bits = self._color_table
+        all_masks = color_mask(hsv, los, his, bits)
+        
         # Process each target color
-        for color_name in self.target_colors:
-            mask = np.zeros((height, width), dtype=np.uint8)
-            ranges = self.color_ranges.get(color_name)
+        for index, color_name in enumerate(target_colors):
+            mask = cv2.bitwise_and(all_masks, 1 << index)
+            # One 3x3 pass at half resolution covers the same area as two at full
+            mask = cv2.erode(mask, None, iterations=1)
+            mask = cv2.dilate(mask, None, iterations=1)
             
-            if ranges:
-                for (lower, upper) in ranges:
-                    mask += cv2.inRange(hsv, lower, upper)
-            
-            mask = cv2.erode(mask, None, iterations=2)
-            mask = cv2.dilate(mask, None, iterations=2)
-            
-            contours, _ = cv2.findContours(mask.copy(), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            # findContours no longer modifies its input (OpenCV >= 3.2), no copy needed
+            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            box_color = COLOR_BOX_BGR.get(color_name, (0, 255, 0))
             
             # Process all contours for this color
             for c in contours:
-                if cv2.contourArea(c) > 500:
+                if cv2.contourArea(c) > min_area:
                     ((x, y), radius) = cv2.minEnclosingCircle(c)
+                    x, y, radius = x * scale, y * scale, radius * scale
                     M = cv2.moments(c)
                     if M["m00"] > 0:
-                        cx = int(M["m10"] / M["m00"])
-                        cy = int(M["m01"] / M["m00"])
+                        cx = int(M["m10"] / M["m00"] * scale)
+                        cy = int(M["m01"] / M["m00"] * scale)
                         
                         dx = cx - center_x
                         dy = center_y - cy 
@@ -750,13 +1001,6 @@ class VideoCamera(object):
                         })
                         
                         # Visual feedback - use different colors for different target colors
-                        box_color = {
-                            "Red": (0, 0, 255),
-                            "Blue": (255, 0, 0),
-                            "Green": (0, 255, 0),
-                            "Yellow": (0, 255, 255)
-                        }.get(color_name, (0, 255, 0))
-                        
                         cv2.circle(frame, (int(x), int(y)), int(radius), box_color, 2)
                         cv2.circle(frame, (cx, cy), 5, (0, 0, 255), -1)
                         cv2.line(frame, (center_x, center_y), (cx, cy), (255, 0, 0), 1)
@@ -768,36 +1012,132 @@ class VideoCamera(object):
         # Atomic swap
         self.last_detection = new_detections
         
-        if self.last_detection:
-            count = len(self.last_detection)
-            colors_str = ", ".join(self.target_colors)
-            print(f"\r[SEARCH] Found {count} object(s) for {colors_str}      ", end="")
-        else:
-            colors_str = ", ".join(self.target_colors)
-            print(f"\r[SEARCH] Searching for {colors_str}...      ", end="")
+        # Console status ticker: formatted and printed only with LOGLEVEL=DEBUG
+        if log.isEnabledFor(logging.DEBUG):
+            if self.last_detection:
+                count = len(self.last_detection)
+                colors_str = ", ".join(self.target_colors)
+                print(f"\r[SEARCH] Found {count} object(s) for {colors_str}      ", end="")
+            else:
+                colors_str = ", ".join(self.target_colors)
+                print(f"\r[SEARCH] Searching for {colors_str}...      ", end="")
         
         return frame
 
+    def _publish_for_target(self, detections, target_object):
+        """
+        Publish a YOLO pass unless the target changed while it ran.
+        
+        Returns:
+            bool: False if the pass was dropped (its results are for the old target)
+        """
+        with self.detection_changed:
+            if self.target_object != target_object:
+                return False
+            self.last_detection = detections
+            return True
+
+    @property
+    def last_detection(self):
+        """Latest list of detections (swapped atomically by the inference thread)."""
+        return self._detection_state[1]
+
+    @last_detection.setter
+    def last_detection(self, detections):
+        state = (next(self._detection_versions), detections, build_vision_state(detections))
+        with self.detection_changed:
+            self._detection_state = state
+            self.detection_changed.notify_all()
+
+    @property
+    def vision_state(self):
+        """LLM vision state for the current detections, built once per detection pass."""
+        return self._detection_state[2]
+
+    @property
+    def detection_version(self):
+        """Monotonic counter bumped every time last_detection is replaced."""
+        return self._detection_state[0]
+
+    def get_detection_snapshot(self):
+        """
+        Returns:
+            tuple: (detection_version, detections) read atomically
+        """
+        version, detections, _ = self._detection_state
+        return version, detections
+
+    def wait_for_detection(self, since_version, timeout):
+        """
+        Block until detection_version differs from `since_version` or timeout elapses.
+
+        Returns:
+            tuple: (detection_version, detections), same as get_detection_snapshot()
+        """
+        with self.detection_changed:
+            self.detection_changed.wait_for(
+                lambda: self._detection_state[0] != since_version, timeout)
+        return self.get_detection_snapshot()
+
+    def _publish_jpeg(self, jpeg_bytes):
+        """Swap in a newly encoded frame and wake any waiting consumers."""
+        with self.frame_ready:
+            self.processed_jpeg = jpeg_bytes
+            self.frame_seq += 1
+            self.frame_ready.notify_all()
+
     def get_frame(self):
         """
         Returns the latest processed frame as JPEG bytes.
         This no longer calls read() directly, making it thread-safe.
         """
-        return self.processed_jpeg
+        with self.frame_lock:
+            return self.processed_jpeg
+    
+    def wait_for_frame(self, last_seq, timeout=1.0):
+        """
+        Block until a frame newer than `last_seq` has been published.
+        
+        Args:
+            last_seq: Sequence number of the last frame the caller has seen
+            timeout: Maximum seconds to wait
+        
+        Returns:
+            tuple: (frame_seq, jpeg_bytes) - frame_seq == last_seq on timeout
+        """
+        with self.frame_ready:
+            if self.frame_seq == last_seq:
+                self.frame_ready.wait(timeout)
+            return self.frame_seq, self.processed_jpeg
+    
+    def wait_for_raw_frame(self, last_seq, timeout=1.0):
+        """
+        Block until a raw frame newer than `last_seq` has been captured.
+        
+        Returns:
+            tuple: (raw_seq, frame) - raw_seq == last_seq on timeout.
+                   The array is shared: copy it before drawing on it.
+        """
+        with self.raw_frame_ready:
+            if self.raw_seq == last_seq:
+                self.raw_frame_ready.wait(timeout)
+            return self.raw_seq, self.raw_frame
     
     def get_raw_frame(self):
         """
         Returns the latest raw frame (numpy array) for processing.
         Used by mimic mode for MediaPipe hand detection.
+        The array is shared: copy it before drawing on it.
         """
-        return self.raw_frame
+        with self.frame_lock:
+            return self.raw_frame
     
     def get_frame_with_detections(self):
         """
         Returns the latest frame with YOLO detections as JPEG bytes.
         Same as get_frame() but explicitly named for clarity.
         """
-        return self.processed_jpeg
+        return self.get_frame()
 
 
     def _open_camera(self):
@@ -805,6 +1145,19 @@ class VideoCamera(object):
         if self.video and self.video.isOpened():
              self.video.release()
              
+        pipeline = os.environ.get("CAMERA_PIPELINE")
+        if pipeline is None and os.environ.get("CAMERA_GSTREAMER") == "1":
+            pipeline = GSTREAMER_PIPELINE.format(index=int(os.environ.get("CAMERA_INDEX", 1)))
+        if pipeline:
+            print(f"[CAMERA] Opening GStreamer pipeline: {pipeline}")
+            self.video = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+            if self.video.isOpened() and self.video.read()[0]:
+                print("[CAMERA] SUCCESS! Connected via GStreamer")
+                self.is_open = True
+                return True
+            print("[CAMERA] GStreamer pipeline failed, falling back to OpenCV backends.")
+            self.video.release()
+             
         self.video = cv2.VideoCapture()
         backends = [("DSHOW", cv2.CAP_DSHOW), ("MSMF", cv2.CAP_MSMF), ("DEFAULT", cv2.CAP_ANY)]
         
@@ -820,13 +1173,22 @@ class VideoCamera(object):
                     ret, _ = self.video.read()
                     if ret:
                         print(f"[CAMERA] SUCCESS! Connected to Camera {idx} using {b_name}")
+                        # Ask for MJPG before sizing: raw YUYV 720p exceeds USB 2.0
+                        # bandwidth on most webcams and drops to ~10 FPS
+                        self.video.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
                         # Force 720p resolution for accurate focal length calibration
                         self.video.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
                         self.video.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
+                        # Keep at most one queued frame in the driver, so a capture-loop
+                        # stall (e.g. GIL held by inference) doesn't leave a backlog of
+                        # old frames to read through (no-op on backends without it)
+                        self.video.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                        self.is_open = True
                         return True
                     else:
                          print(f"[CAMERA] Opened {idx} but failed to read frame.")
                          self.video.release()
         
         print("[CAMERA] CRITICAL: Could not open any camera.")
+        self.is_open = False
         return False
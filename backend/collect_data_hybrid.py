@@ -59,8 +59,8 @@ class HybridDataCollector:
         path = 'brain/models/anfis_x.pth'
         if os.path.exists(path):
             model = ANFIS(n_inputs=1, n_rules=5, input_ranges=[(-400, 400)])
-            model.load_state_dict(torch.load(path))
-            model.eval()
+            model.load_state_dict(torch.load(path, map_location='cpu', weights_only=True))
+            model.freeze()
             print("[ANFIS] Loaded X-axis model")
             return model
         else:
@@ -72,7 +72,7 @@ class HybridDataCollector:
         if not self.brain_x:
             return 1.0 if error_x > 0 else -1.0
         
-        with torch.no_grad():
+        with torch.inference_mode():
             inp = torch.tensor([[error_x]], dtype=torch.float32)
             return self.brain_x(inp).item()
     
@@ -94,7 +94,9 @@ class HybridDataCollector:
         
         for iteration in range(MAX_ALIGNMENT_ITERATIONS):
             time.sleep(0.5)
-            detections = self.camera.last_detection
+            # First detection pass to complete after the settle, so a pass whose
+            # frame was captured while the arm was still moving isn't recorded
+            _, detections = self.camera.wait_for_detection(self.camera.detection_version, timeout=0.5)
             
             if not detections:
                 print(f"  Iter {iteration+1}: No object detected")
@@ -210,8 +210,8 @@ class VisualCompensationCollector:
         path = 'brain/models/anfis_x.pth'
         if os.path.exists(path):
             model = ANFIS(n_inputs=1, n_rules=5, input_ranges=[(-400, 400)])
-            model.load_state_dict(torch.load(path))
-            model.eval()
+            model.load_state_dict(torch.load(path, map_location='cpu', weights_only=True))
+            model.freeze()
             print("✅ Loaded ANFIS X-axis model")
             return model
         print("⚠️  ANFIS model not found, using fallback")
@@ -220,7 +220,7 @@ class VisualCompensationCollector:
     def _predict_x(self, error_x):
         if not self.brain_x:
             return 1.0 if error_x > 0 else -1.0
-        with torch.no_grad():
+        with torch.inference_mode():
             inp = torch.tensor([[error_x]], dtype=torch.float32)
             return self.brain_x(inp).item()
     
@@ -313,7 +313,9 @@ class VisualCompensationCollector:
         
         for iteration in range(MAX_ALIGNMENT_ITERATIONS):
             time.sleep(0.5)
-            detections = self.camera.last_detection
+            # First detection pass to complete after the settle, so a pass whose
+            # frame was captured while the arm was still moving isn't recorded
+            _, detections = self.camera.wait_for_detection(self.camera.detection_version, timeout=0.5)
             
             if not detections:
                 # Sweep search
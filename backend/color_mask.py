@@ -0,0 +1,101 @@
+"""
+Fused HSV Color Masking
+
+Tests every target color range in a single pass over the HSV image and writes
+a uint8 bit-flag mask: bit k is set where the pixel matches color k. Colors
+keep their own bit, so overlapping ranges (e.g. Yellow/Green) behave exactly
+like separate cv2.inRange masks.
+
+Uses a Numba kernel when numba is installed (optional dependency); otherwise
+falls back to one cv2.inRange per range.
+"""
+
+import cv2
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+MAX_COLORS = 8  # One bit per color in a uint8 mask
+
+
+def build_range_table(color_ranges, color_names):
+    """
+    Flatten the (lower, upper) ranges of the given colors into contiguous arrays.
+
+    Args:
+        color_ranges (dict): Color name -> list of (lower, upper) HSV arrays
+        color_names (list): Colors to include, in bit order
+
+    Returns:
+        tuple: (los, his, bits) - los/his are (R, 3) uint8, bits is (R,) uint8
+               holding the color bit each range sets
+    """
+    if len(color_names) > MAX_COLORS:
+        raise ValueError(f"At most {MAX_COLORS} colors can share one mask")
+
+    los, his, bits = [], [], []
+    for index, color_name in enumerate(color_names):
+        for (lower, upper) in color_ranges.get(color_name, []):
+            los.append(lower)
+            his.append(upper)
+            bits.append(1 << index)
+
+    if not los:
+        empty = np.zeros((0, 3), dtype=np.uint8)
+        return empty, empty.copy(), np.zeros(0, dtype=np.uint8)
+
+    return (np.ascontiguousarray(los, dtype=np.uint8),
+            np.ascontiguousarray(his, dtype=np.uint8),
+            np.ascontiguousarray(bits, dtype=np.uint8))
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _color_mask_kernel(hsv, los, his, bits, out):
+        height, width = out.shape
+        n_ranges = los.shape[0]
+        for y in prange(height):
+            for x in range(width):
+                h = hsv[y, x, 0]
+                s = hsv[y, x, 1]
+                v = hsv[y, x, 2]
+                flags = 0
+                for k in range(n_ranges):
+                    # Hue first: most pixels are rejected on the first test
+                    if h < los[k, 0] or h > his[k, 0]:
+                        continue
+                    if s < los[k, 1] or s > his[k, 1] or v < los[k, 2] or v > his[k, 2]:
+                        continue
+                    flags |= bits[k]
+                out[y, x] = flags
+
+
+def color_mask(hsv, los, his, bits, out=None):
+    """
+    Compute the bit-flag color mask of an HSV image in one pass.
+
+    Args:
+        hsv (np.ndarray): HxWx3 uint8 HSV image
+        los, his, bits: Arrays from build_range_table()
+        out (np.ndarray): Optional HxW uint8 buffer to reuse
+
+    Returns:
+        np.ndarray: HxW uint8 mask; use `cv2.bitwise_and(mask, bit)` to
+                    extract one color
+    """
+    if out is None:
+        out = np.empty(hsv.shape[:2], dtype=np.uint8)
+
+    if NUMBA_AVAILABLE:
+        _color_mask_kernel(hsv, los, his, bits, out)
+        return out
+
+    out[:] = 0
+    for k in range(len(los)):
+        in_range = cv2.inRange(hsv, los[k], his[k])
+        cv2.bitwise_or(out, int(bits[k]), dst=out, mask=in_range)
+    return out
@@ -3,6 +3,8 @@ import torch
 import threading
 import sys
 import os
+import logging
+from collections import deque
 
 # Ensure imports work
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -12,11 +14,32 @@ from camera import VideoCamera
 from brain.anfis_pytorch import ANFIS
 from brain.kinematics import solve_angles # Corrected import
 
+log = logging.getLogger(__name__)
+
+# step_z from the approach brain is in cm per iteration of the original 20 Hz loop
+APPROACH_STEP_PERIOD = 0.05
+# Give up if the target isn't reached within this many seconds
+APPROACH_TIMEOUT = 30.0
+# Stall check: distance must shrink by at least STALL_MIN_PROGRESS_CM over the
+# last STALL_WINDOW passes in which the approach brain commanded a step
+STALL_WINDOW = 10
+STALL_MIN_PROGRESS_CM = 0.5
+# step_z below this means the approach brain is holding (e.g. still steering)
+MIN_APPROACH_STEP = 0.05
+# Per-pass details go to DEBUG; an INFO summary is emitted at most this often
+SUMMARY_PERIOD = 1.0
+# Give up once an acquired target is missing from this many consecutive passes
+MAX_CONSECUTIVE_MISSES = 8
+# EMA weight of the newest pass for error_x / distance_cm (bbox jitter filter)
+DETECTION_EMA_ALPHA = 0.4
+
 class DualBrainController:
     def __init__(self, robot, camera):
         self.robot = robot
         self.camera = camera
         self.active = False
+        # detection_version of the last pass the control loop acted on
+        self._last_seen_version = None
         
         # BRAIN 1: Steering (X-Axis)
         # 1 Input (Error X), 5 Rules
@@ -24,22 +47,22 @@ class DualBrainController:
         self.net_steer = ANFIS(n_inputs=1, n_rules=5)
         path_steer = os.path.join(os.path.dirname(__file__), 'brain/anfis_center.pth')
         if os.path.exists(path_steer):
-            self.net_steer.load_state_dict(torch.load(path_steer))
+            self.net_steer.load_state_dict(torch.load(path_steer, map_location='cpu', weights_only=True))
             print(f"Loaded Steering Brain from {path_steer}")
         else:
             print(f"WARNING: Steering Brain not found at {path_steer}")
-        self.net_steer.eval()
+        self.net_steer.freeze()
         
         # BRAIN 2: Approach (Z-Axis)
         # 2 Inputs (Distance, Error), 6 Rules
         self.net_approach = ANFIS(n_inputs=2, n_rules=6)
         path_approach = os.path.join(os.path.dirname(__file__), 'brain/anfis_approach.pth')
         if os.path.exists(path_approach):
-            self.net_approach.load_state_dict(torch.load(path_approach))
+            self.net_approach.load_state_dict(torch.load(path_approach, map_location='cpu', weights_only=True))
             print(f"Loaded Approach Brain from {path_approach}")
         else:
              print(f"WARNING: Approach Brain not found at {path_approach}")
-        self.net_approach.eval()
+        self.net_approach.freeze()
 
     def start(self, target_name):
         self.active = True
@@ -47,6 +70,20 @@ class DualBrainController:
         # For simplicity in testing, run in main thread or join
         self._control_loop(target_name)
 
+    def _get_fresh_detections(self, timeout=0.25):
+        """
+        Detections from a pass newer than the last one consumed, or None on timeout.
+        Passes published while the previous iteration was busy are skipped, so the
+        loop always acts on the latest error instead of working through a backlog.
+        """
+        version, detections = self.camera.wait_for_detection(self._last_seen_version, timeout)
+        if version == self._last_seen_version:
+            return None
+        if self._last_seen_version is not None and version - self._last_seen_version > 1:
+            log.debug("Skipped %d stale detection pass(es)", version - self._last_seen_version - 1)
+        self._last_seen_version = version
+        return detections
+
     def _control_loop(self, target_name):
         print(f"Starting Dual-Brain Control for target: {target_name}")
         # Initial State
@@ -56,12 +93,31 @@ class DualBrainController:
         angles = solve_angles(curr_x, curr_y, curr_z)
         self.robot.move_to(angles)
         
+        searching = False
+        acquired = False
+        misses = 0
+        last_step = time.time()
+        deadline = time.monotonic() + APPROACH_TIMEOUT
+        recent_dist = deque(maxlen=STALL_WINDOW)
+        last_summary = time.monotonic()
+        passes = 0
+        # Smoothed error/distance; None until the first valid reading after (re)acquisition
+        ema_error_x = None
+        ema_dist = None
         while self.active:
+            # Checked every pass; a pass waits at most 0.25 s for detections
+            if time.monotonic() > deadline:
+                print(f"Approach timed out after {APPROACH_TIMEOUT:.0f}s")
+                break
+
             # 1. Perception
             # We need to find the specific target object
             # User snippet: detection = self.camera.get_object(target_name)
             # Assuming functionality, or we iterate last_detection
-            detection_list = getattr(self.camera, 'last_detection', [])
+            # Paced by the camera: blocks until the next detection pass
+            detection_list = self._get_fresh_detections()
+            if detection_list is None:
+                continue
             target = None
             for d in detection_list:
                 if d.get('object_name', '') == target_name:
@@ -69,16 +125,40 @@ class DualBrainController:
                     break
             
             if not target:
-                print(f"Searching for {target_name}...")
-                time.sleep(0.5)
+                # The arm holds still while the target is missing, so a target
+                # lost mid-approach won't come back on its own
+                if acquired:
+                    misses += 1
+                    if misses > MAX_CONSECUTIVE_MISSES:
+                        print(f"Lost {target_name} for {misses} passes, stopping approach")
+                        break
+                if not searching:
+                    print(f"Searching for {target_name}...")
+                    searching = True
+                recent_dist.clear()
+                ema_error_x = ema_dist = None
                 continue
+            searching = False
+            acquired = True
+            misses = 0
 
             # Calculate Error (Center is 640 for 1280px)
-            error_x = target['x'] - 640
-            dist_cm = target.get('distance_cm', 0)
+            raw_error_x = target['x'] - 640
+            raw_dist_cm = target.get('distance_cm', 0)
+
+            # Smooth the 1-3 px bbox jitter between passes so the brains don't
+            # chase it with a new base move every frame
+            if ema_error_x is None:
+                ema_error_x = raw_error_x
+            else:
+                ema_error_x += DETECTION_EMA_ALPHA * (raw_error_x - ema_error_x)
+            if raw_dist_cm > 0:
+                ema_dist = raw_dist_cm if ema_dist is None else ema_dist + DETECTION_EMA_ALPHA * (raw_dist_cm - ema_dist)
+            error_x = ema_error_x
+            dist_cm = ema_dist if ema_dist is not None else raw_dist_cm
             
             # 2. Inference (The Dual Brain)
-            with torch.no_grad():
+            with torch.inference_mode():
                 # Brain 1: How much to turn? (Input: Error X)
                 d_theta = self.net_steer(torch.tensor([[float(error_x)]])).item()
                 
@@ -86,7 +166,25 @@ class DualBrainController:
                 # If Error is high, speed ~0
                 step_z = self.net_approach(torch.tensor([[float(dist_cm), float(abs(error_x))]])).item()
 
-            print(f"Err: {error_x:.1f}px -> Turn: {d_theta:.2f} | Dist: {dist_cm:.1f}cm -> Step: {step_z:.2f}")
+            log.debug("Err: %.1fpx -> Turn: %.2f | Dist: %.1fcm -> Step: %.2f", error_x, d_theta, dist_cm, step_z)
+            passes += 1
+            now = time.monotonic()
+            if now - last_summary > SUMMARY_PERIOD:
+                log.info("Approach: %d passes/%.1fs | Err: %.1fpx | Dist: %.1fcm | Step: %.2f",
+                         passes, now - last_summary, error_x, dist_cm, step_z)
+                last_summary = now
+                passes = 0
+
+            # Stall detection: only passes that should make progress count,
+            # so steering in place (step ~0) never trips it
+            if dist_cm > 0 and step_z > MIN_APPROACH_STEP:
+                recent_dist.append(dist_cm)
+                if len(recent_dist) == STALL_WINDOW and recent_dist[0] - recent_dist[-1] < STALL_MIN_PROGRESS_CM:
+                    print(f"Not converging: distance {recent_dist[0]:.1f} -> {recent_dist[-1]:.1f}cm "
+                          f"over {STALL_WINDOW} passes")
+                    break
+            else:
+                recent_dist.clear()
 
             # 3. Fusion & Update
             # Update Angle directly (Steering)
@@ -100,7 +198,11 @@ class DualBrainController:
             # User snippet: curr_z -= step_z # Move closer
             # In teach_approach.py: curr_x, curr_y, curr_z = (0, 15, 30)
             # So Z reduces as we get closer.
-            curr_z -= step_z 
+            # Iterations now follow detection passes, so scale the step by the
+            # elapsed time to keep the tuned cm-per-20Hz-tick approach speed
+            now = time.time()
+            curr_z -= step_z * min((now - last_step) / APPROACH_STEP_PERIOD, 2.0)
+            last_step = now
             
             # 4. Actuation
             # We mix IK for the arm height with direct ANFIS control for the base
@@ -111,17 +213,19 @@ class DualBrainController:
                 # Safety limits
                 curr_z = max(5, curr_z)
                 
-                self.robot.move_to(angles)
+                # Latest-wins: the motion worker drives the servos while this
+                # loop moves on to the next detection pass
+                self.robot.enqueue(angles)
             except ValueError:
                 print("Target out of reach!")
                 break
             
             # 5. Grab Check
-            if dist_cm < 3.0 and dist_cm > 0: # Valid non-zero distance
+            # Raw reading: the smoothed distance lags behind the approach
+            if raw_dist_cm < 3.0 and raw_dist_cm > 0: # Valid non-zero distance
+                self.robot.flush_moves()  # No queued approach step may run after the grab
                 self.perform_grab()
                 break
-                
-            time.sleep(0.05) # 20Hz Loop
 
     def perform_grab(self):
         print("Grabbing...")
@@ -141,6 +245,7 @@ class DualBrainController:
 
 if __name__ == "__main__":
     # Standalone Execution
+    logging.basicConfig(level=os.environ.get('LOGLEVEL', 'INFO').upper(), format='%(message)s')
     try:
         robot = RobotArm(simulation_mode=False)
         camera = VideoCamera(detection_mode='yolo')
@@ -159,5 +264,4 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         print("Stopping...")
     finally:
-        if hasattr(camera, 'release'):
-            camera.release()
+        camera.stop()
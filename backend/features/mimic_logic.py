@@ -5,15 +5,25 @@ import math
 import numpy as np
 import time
 import threading
+import logging
 import torch
 import os
 from brain.anfis_pytorch import ANFIS
+from jpeg_encoder import encode_jpeg
+from frame_drawing import copy_into, TextSprite
+
+log = logging.getLogger(__name__)
 
 # --- CONFIGURATION ---
 REAL_PALM_WIDTH = 8.5   # cm (Average palm width)
 FOCAL_LENGTH = 1424     # From calibration
 CENTER_TOLERANCE = 50   # Pixels within which palm is "centered"
 SMOOTHING_ALPHA = 0.10  # 0.10 = Very Smooth/Heavy, 0.15 = Smooth, 0.5 = Fast/Jittery
+# Per-step tracking status goes to DEBUG; an INFO summary is emitted at most this often
+SUMMARY_PERIOD = 1.0
+
+# Constant video-feed label, rasterized once
+LABEL_HAND_TRACKING = TextSprite("Mode: HAND TRACKING", (10, 30), (0, 255, 0))
 
 class SmoothFilter:
     def __init__(self, alpha=0.15):
@@ -43,6 +53,7 @@ class MimicController:
         self.palm_center = None
         self.is_centered = False
         self.hand_lock = threading.Lock()
+        self._frame_buffer = None  # Reused overlay frame for the mimic video feed
         
         # Telemetry state (for frontend display)
         self.telemetry = {
@@ -70,8 +81,8 @@ class MimicController:
         
         try:
             if os.path.exists(model_path):
-                self.model.load_state_dict(torch.load(model_path))
-                self.model.eval()
+                self.model.load_state_dict(torch.load(model_path, map_location='cpu', weights_only=True))
+                self.model.freeze()
                 self.use_anfis = True
                 print(f"[MIMIC] ANFIS Brain (X-Axis) Loaded! 🧠")
             else:
@@ -82,7 +93,7 @@ class MimicController:
     def predict_correction(self, error):
         """Neural inference for correction angle (X-axis)"""
         if not self.use_anfis: return 0.0
-        with torch.no_grad():
+        with torch.inference_mode():
             inputs = torch.tensor([[error]], dtype=torch.float32)
             return self.model(inputs).item()
         
@@ -129,17 +140,21 @@ class MimicController:
             self.active = False
             return
         
+        last_seq = 0
+        last_summary = time.monotonic()
+        steps = 0
         while self.active:
             if self.camera is None:
                 print("⚠️ No camera available for Mimic Mode", flush=True)
                 time.sleep(0.1)
                 continue
                 
-            # Get frame from global camera
-            frame = self.camera.get_raw_frame()
-            if frame is None:
-                time.sleep(0.03)
+            # Wait for the next frame from the global camera: MediaPipe runs
+            # exactly once per captured frame, however many feeds are open
+            seq, frame = self.camera.wait_for_raw_frame(last_seq, timeout=0.5)
+            if seq == last_seq or frame is None:
                 continue
+            last_seq = seq
 
             # Process with MediaPipe
             h, w, _ = frame.shape
@@ -149,135 +164,141 @@ class MimicController:
             rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             results = detector.process(rgb_frame)
 
-            # Store landmarks for video overlay
+            # Publish landmarks, palm center and centered flag together, so the
+            # video overlay never draws a skeleton with a stale palm marker
             with self.hand_lock:
                 if results.multi_hand_landmarks:
-                    self.hand_landmarks = results.multi_hand_landmarks[0]
-                else:
-                    self.hand_landmarks = None
-                    self.palm_center = None
-                    self.is_centered = False
-
-            if results.multi_hand_landmarks:
-                for hand_lm in results.multi_hand_landmarks:
+                    # max_num_hands=1: the first hand is the only one
+                    hand_lm = results.multi_hand_landmarks[0]
                     # === CALCULATE PALM CENTER ===
                     palm_x = ((hand_lm.landmark[0].x + hand_lm.landmark[9].x) / 2) * w
                     palm_y = ((hand_lm.landmark[0].y + hand_lm.landmark[9].y) / 2) * h
                     
-                    # Store for visual overlay
-                    with self.hand_lock:
-                        self.palm_center = (int(palm_x), int(palm_y))
-                    
                     # === CENTERING ERROR CALCULATION ===
                     error_x = frame_center_x - palm_x
                     error_y = frame_center_y - palm_y
                     
                     # Check if centered
                     is_centered = abs(error_x) <= CENTER_TOLERANCE and abs(error_y) <= CENTER_TOLERANCE
-                    with self.hand_lock:
-                        self.is_centered = is_centered
-                    
-                    # Apply smoothing
-                    s_error_x = self.smooth_error_x.update(error_x)
-                    s_error_y = self.smooth_error_y.update(error_y)
-                    
-                    # === DEPTH CALCULATION (Pinhole Camera Theory) ===
-                    x5 = hand_lm.landmark[5].x * w
-                    y5 = hand_lm.landmark[5].y * h
-                    x17 = hand_lm.landmark[17].x * w
-                    y17 = hand_lm.landmark[17].y * h
-                    palm_width_px = math.hypot(x17 - x5, y17 - y5)
-                    
-                    if palm_width_px > 1:
-                        distance_cm = (REAL_PALM_WIDTH * FOCAL_LENGTH) / palm_width_px
-                    else:
-                        distance_cm = 999
-                    
-                    # Use actual distance for reach (no normalization)
-                    # This allows full 15-45cm range to be displayed and used
-                    s_reach = self.smooth_depth.update(distance_cm)
-                    
-                    # === GRIPPER (Thumb-Index Pinch) ===
-                    thumb_x = hand_lm.landmark[4].x * w
-                    thumb_y = hand_lm.landmark[4].y * h
-                    index_x = hand_lm.landmark[8].x * w
-                    index_y = hand_lm.landmark[8].y * h
-                    pinch = math.hypot(index_x - thumb_x, index_y - thumb_y)
-                    gripper = 120 if pinch < 40 else 180
-                    gripper_state = "CLOSED" if gripper == 120 else "OPEN"
-                    
-                    # === UPDATE TELEMETRY ===
-                    with self.telemetry_lock:
-                        self.telemetry = {
-                            "error_x": round(s_error_x, 1),
-                            "error_y": round(s_error_y, 1),
-                            "reach": round(s_reach, 1),
-                            "gripper": gripper_state,
-                            "is_centered": is_centered
-                        }
-                    
-                    # === SEND COMMANDS TO ROBOT ===
-                    # Control Constants (tuned for smooth hand tracking)
-                    GAIN_X = 0.005     # Base rotation gain (reduced for stability)
-                    GAIN_Y = 0.005     # Elbow tilt gain (reduced for stability)
-                    MAX_STEP = 1.0     # Max angle change per frame (limit to 1 deg)
-                    MIN_MOVE = 0.2     # Minimum movement threshold (allow fine control)
-                    
-                    # Fixed servos for mimic mode
-                    WRIST_PITCH = 90
-                    WRIST_ROLL = 12
                     
-                    # Get current angles
-                    current_angles = self.robot.current_angles
-                    current_base = current_angles[0]
+                    self.hand_landmarks = hand_lm
+                    self.palm_center = (int(palm_x), int(palm_y))
+                    self.is_centered = is_centered
+                else:
+                    self.hand_landmarks = None
+                    self.palm_center = None
+                    self.is_centered = False
+
+            if results.multi_hand_landmarks:
+                # Apply smoothing
+                s_error_x = self.smooth_error_x.update(error_x)
+                s_error_y = self.smooth_error_y.update(error_y)
+                
+                # === DEPTH CALCULATION (Pinhole Camera Theory) ===
+                x5 = hand_lm.landmark[5].x * w
+                y5 = hand_lm.landmark[5].y * h
+                x17 = hand_lm.landmark[17].x * w
+                y17 = hand_lm.landmark[17].y * h
+                palm_width_px = math.hypot(x17 - x5, y17 - y5)
+                
+                if palm_width_px > 1:
+                    distance_cm = (REAL_PALM_WIDTH * FOCAL_LENGTH) / palm_width_px
+                else:
+                    distance_cm = 999
+                
+                # Use actual distance for reach (no normalization)
+                # This allows full 15-45cm range to be displayed and used
+                s_reach = self.smooth_depth.update(distance_cm)
+                
+                # === GRIPPER (Thumb-Index Pinch) ===
+                thumb_x = hand_lm.landmark[4].x * w
+                thumb_y = hand_lm.landmark[4].y * h
+                index_x = hand_lm.landmark[8].x * w
+                index_y = hand_lm.landmark[8].y * h
+                pinch = math.hypot(index_x - thumb_x, index_y - thumb_y)
+                gripper = 120 if pinch < 40 else 180
+                gripper_state = "CLOSED" if gripper == 120 else "OPEN"
+                
+                # === UPDATE TELEMETRY ===
+                with self.telemetry_lock:
+                    self.telemetry = {
+                        "error_x": round(s_error_x, 1),
+                        "error_y": round(s_error_y, 1),
+                        "reach": round(s_reach, 1),
+                        "gripper": gripper_state,
+                        "is_centered": is_centered
+                    }
+                
+                # === SEND COMMANDS TO ROBOT ===
+                # Control Constants (tuned for smooth hand tracking)
+                GAIN_X = 0.005     # Base rotation gain (reduced for stability)
+                GAIN_Y = 0.005     # Elbow tilt gain (reduced for stability)
+                MAX_STEP = 1.0     # Max angle change per frame (limit to 1 deg)
+                MIN_MOVE = 0.2     # Minimum movement threshold (allow fine control)
+                
+                # Fixed servos for mimic mode
+                WRIST_PITCH = 90
+                WRIST_ROLL = 12
+                
+                # Get current angles
+                current_angles = self.robot.current_angles
+                current_base = current_angles[0]
+                
+                # Calculate Base correction (X-axis centering)
+                # Calculate Base correction (X-axis centering)
+                # HYBRID CONTROL: Use ANFIS if available, else P-Control
+                if self.use_anfis:
+                     # Neural Network Control
+                     base_correction = self.predict_correction(s_error_x)
+                     # Note: ANFIS output is already clamped/scaled by training data (-1 to 1 mostly)
+                     # But let's respect the MAX_STEP speed limit
+                     base_correction = max(-MAX_STEP, min(MAX_STEP, base_correction))
+                else:
+                    # Legacy P-Control
+                    base_correction = s_error_x * GAIN_X
+                    if abs(base_correction) < MIN_MOVE and abs(base_correction) > 0.1:
+                        base_correction = MIN_MOVE * (1 if base_correction > 0 else -1)
+                    base_correction = max(-MAX_STEP, min(MAX_STEP, base_correction))
+                new_base = max(0, min(180, current_base + base_correction))
+                
+                # Map reach to shoulder and elbow (FULL RANGE)
+                # Close palm (20cm) -> shoulder=155°, elbow=150° (minimum reach)
+                # Far palm (65cm) -> shoulder=0°, elbow=0° (maximum reach)
+                base_shoulder = np.interp(s_reach, [20, 65], [155, 0])
+                base_elbow = np.interp(s_reach, [20, 65], [150, 0])
+                
+                # Apply Y-axis centering correction on top of reach-based elbow
+                elbow_correction = -(s_error_y * GAIN_Y)  # Negative because up = lower angle
+                if abs(elbow_correction) < MIN_MOVE and abs(elbow_correction) > 0.1:
+                    elbow_correction = MIN_MOVE * (1 if elbow_correction > 0 else -1)
+                elbow_correction = max(-MAX_STEP, min(MAX_STEP, elbow_correction))
+                
+                new_shoulder = max(0, min(180, base_shoulder))
+                new_elbow = max(0, min(150, base_elbow + elbow_correction))
+                
+                # Send to robot
+                try:
+                    self.robot.move_to([new_base, new_shoulder, new_elbow, WRIST_PITCH, WRIST_ROLL, gripper])
                     
-                    # Calculate Base correction (X-axis centering)
-                    # Calculate Base correction (X-axis centering)
-                    # HYBRID CONTROL: Use ANFIS if available, else P-Control
-                    if self.use_anfis:
-                         # Neural Network Control
-                         base_correction = self.predict_correction(s_error_x)
-                         # Note: ANFIS output is already clamped/scaled by training data (-1 to 1 mostly)
-                         # But let's respect the MAX_STEP speed limit
-                         base_correction = max(-MAX_STEP, min(MAX_STEP, base_correction))
+                    if not is_centered:
+                        log.debug("[MIMIC] Tracking: X=%+.0fpx Y=%+.0fpx | Base=%.0f° Elbow=%.0f° | Reach=%.1fcm | %s",
+                                  s_error_x, s_error_y, new_base, new_elbow, s_reach, gripper_state)
                     else:
-                        # Legacy P-Control
-                        base_correction = s_error_x * GAIN_X
-                        if abs(base_correction) < MIN_MOVE and abs(base_correction) > 0.1:
-                            base_correction = MIN_MOVE * (1 if base_correction > 0 else -1)
-                        base_correction = max(-MAX_STEP, min(MAX_STEP, base_correction))
-                    new_base = max(0, min(180, current_base + base_correction))
-                    
-                    # Map reach to shoulder and elbow (FULL RANGE)
-                    # Close palm (20cm) -> shoulder=155°, elbow=150° (minimum reach)
-                    # Far palm (65cm) -> shoulder=0°, elbow=0° (maximum reach)
-                    base_shoulder = np.interp(s_reach, [20, 65], [155, 0])
-                    base_elbow = np.interp(s_reach, [20, 65], [150, 0])
-                    
-                    # Apply Y-axis centering correction on top of reach-based elbow
-                    elbow_correction = -(s_error_y * GAIN_Y)  # Negative because up = lower angle
-                    if abs(elbow_correction) < MIN_MOVE and abs(elbow_correction) > 0.1:
-                        elbow_correction = MIN_MOVE * (1 if elbow_correction > 0 else -1)
-                    elbow_correction = max(-MAX_STEP, min(MAX_STEP, elbow_correction))
-                    
-                    new_shoulder = max(0, min(180, base_shoulder))
-                    new_elbow = max(0, min(150, base_elbow + elbow_correction))
-                    
-                    # Send to robot
-                    try:
-                        self.robot.move_to([new_base, new_shoulder, new_elbow, WRIST_PITCH, WRIST_ROLL, gripper])
+                        log.debug("[MIMIC] ✓ CENTERED | Base=%.0f° Shoulder=%.0f° Elbow=%.0f° | Reach=%.1fcm | %s",
+                                  new_base, new_shoulder, new_elbow, s_reach, gripper_state)
+                    steps += 1
+                    now = time.monotonic()
+                    if now - last_summary > SUMMARY_PERIOD:
+                        log.info("[MIMIC] %d steps/%.1fs | %s | Base=%.0f° Elbow=%.0f° | Reach=%.1fcm | %s",
+                                 steps, now - last_summary, "CENTERED" if is_centered else "Tracking",
+                                 new_base, new_elbow, s_reach, gripper_state)
+                        last_summary = now
+                        steps = 0
                         
-                        if not is_centered:
-                            print(f"\r[MIMIC] Tracking: X={s_error_x:+.0f}px Y={s_error_y:+.0f}px | Base={new_base:.0f}° Elbow={new_elbow:.0f}° | Reach={s_reach:.1f}cm | {gripper_state}    ", end="", flush=True)
-                        else:
-                            print(f"\r[MIMIC] ✓ CENTERED | Base={new_base:.0f}° Shoulder={new_shoulder:.0f}° Elbow={new_elbow:.0f}° | Reach={s_reach:.1f}cm | {gripper_state}    ", end="", flush=True)
-                            
-                    except Exception as e:
-                        print(f"\n[MIMIC ERROR] Failed to move robot: {e}", flush=True)
-                        import traceback
-                        traceback.print_exc()
-            
-            time.sleep(0.03)
+                except Exception as e:
+                    print(f"[MIMIC ERROR] Failed to move robot: {e}", flush=True)
+                    import traceback
+                    traceback.print_exc()
 
         # Cleanup
         detector.close()
@@ -285,7 +306,7 @@ class MimicController:
             self.hand_landmarks = None
             self.palm_center = None
             self.is_centered = False
-        print("\n--- MIMIC MODE STOPPED ---", flush=True)
+        print("--- MIMIC MODE STOPPED ---", flush=True)
 
     def stop(self):
         self.active = False
@@ -295,6 +316,26 @@ class MimicController:
         with self.telemetry_lock:
             return self.telemetry.copy()
         
+    def wait_for_frame(self, last_seq, timeout=1.0):
+        """
+        Frame source for the mimic FrameBroadcaster: waits for the next raw camera
+        frame, draws the hand overlay and encodes it once for all clients.
+        
+        Returns:
+            tuple: (seq, jpeg_bytes) - (last_seq, None) on timeout
+        """
+        seq, raw_frame = self.camera.wait_for_raw_frame(last_seq, timeout)
+        if seq == last_seq or raw_frame is None:
+            return last_seq, None
+        
+        # Scratch buffer is safe to reuse: the broadcaster's single reader thread
+        # encodes it before asking for the next frame
+        img = self._frame_buffer = copy_into(self._frame_buffer, raw_frame)
+        LABEL_HAND_TRACKING.draw(img)
+        if self.active:
+            img = self.draw_hand_overlay(img)
+        return seq, encode_jpeg(img)
+        
     def draw_hand_overlay(self, frame):
         """Draw hand landmarks and centering visualization on frame for video feed"""
         landmarks, palm_center, is_centered = self.get_hand_landmarks()
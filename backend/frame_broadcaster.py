@@ -0,0 +1,114 @@
+"""
+Frame Broadcaster for MJPEG Streaming
+
+A single background reader pulls the latest JPEG from the camera and wakes
+every connected client through its own threading.Event. Client generators
+block on their event instead of polling, and never receive the same frame twice.
+"""
+
+import threading
+import time
+from threading import get_ident
+
+
+class CameraEvent:
+    """
+    An Event-like class that signals all active clients when a new frame is available.
+    Each client thread gets its own threading.Event, keyed by thread id.
+    """
+    def __init__(self):
+        self.events = {}
+        self.lock = threading.Lock()
+
+    def wait(self, timeout=None):
+        """Invoked from each client's thread to wait for the next frame."""
+        ident = get_ident()
+        with self.lock:
+            if ident not in self.events:
+                # New client: [event, last time it was set]
+                self.events[ident] = [threading.Event(), time.time()]
+            event = self.events[ident][0]
+        return event.wait(timeout)
+
+    def set(self):
+        """Invoked by the reader thread when a new frame is available."""
+        now = time.time()
+        stale = []
+        with self.lock:
+            for ident, (event, last_set) in self.events.items():
+                if not event.is_set():
+                    event.set()
+                    self.events[ident][1] = now
+                elif now - last_set > 5:
+                    # Event still set 5s later: client is gone
+                    stale.append(ident)
+            for ident in stale:
+                del self.events[ident]
+
+    def clear(self):
+        """Invoked from each client's thread after a frame was processed."""
+        with self.lock:
+            entry = self.events.get(get_ident())
+        if entry:
+            entry[0].clear()
+
+
+class FrameBroadcaster:
+    """
+    Fan-out of camera JPEG frames to any number of streaming clients.
+
+    The reader thread is started on the first client request and exits by
+    itself after `idle_timeout` seconds without clients.
+    """
+    def __init__(self, camera, idle_timeout=10.0):
+        # `camera` is any frame source with wait_for_frame(last_seq) -> (seq, jpeg)
+        self.camera = camera
+        self.idle_timeout = idle_timeout
+        self.frame = None
+        self.event = CameraEvent()
+        self.thread = None
+        self.last_access = 0
+        self.lock = threading.Lock()
+
+    def _ensure_reader(self):
+        """Start the reader thread if it is not running."""
+        with self.lock:
+            self.last_access = time.time()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._reader, daemon=True)
+                self.thread.start()
+
+    def get_frame(self, timeout=1.0):
+        """
+        Block until a frame newer than the last one seen by this client is available.
+
+        Latest frame wins: a client still writing the previous frame finds its
+        event already set and gets only the newest frame, never a backlog of
+        the ones published in the meantime.
+
+        Returns:
+            bytes: JPEG frame, or None if no frame arrived within timeout
+        """
+        self._ensure_reader()
+        if not self.event.wait(timeout):
+            return None
+        self.event.clear()
+        return self.frame
+
+    def _reader(self):
+        """Background thread: publish each new camera frame exactly once."""
+        print("[BROADCAST] Frame reader started.")
+        last_seq = 0
+        while True:
+            # Sleeps inside the camera until the capture thread publishes
+            seq, frame = self.camera.wait_for_frame(last_seq)
+            if seq != last_seq and frame is not None:
+                last_seq = seq
+                self.frame = frame
+                self.event.set()
+
+            with self.lock:
+                if time.time() - self.last_access > self.idle_timeout:
+                    self.thread = None
+                    print("[BROADCAST] No clients, stopping frame reader.")
+                    break
@@ -0,0 +1,56 @@
+"""
+Drawing Helpers for the Display Frames
+
+Shared by the camera overlay and the mimic-mode overlay: a reusable scratch
+buffer for the per-frame copy, and constant HUD labels rasterized once and
+blitted onto each frame.
+"""
+
+import cv2
+import numpy as np
+
+
+def copy_into(buffer, image):
+    """
+    Copy `image` into a reusable scratch buffer (reallocated only if the shape changes).
+    Avoids a fresh ~2.7MB allocation (and its page faults) per 720p frame.
+    
+    Returns:
+        np.ndarray: The buffer now holding a copy of `image`
+    """
+    if buffer is None or buffer.shape != image.shape or buffer.dtype != image.dtype:
+        buffer = np.empty_like(image)
+    np.copyto(buffer, image)
+    return buffer
+
+
+class TextSprite:
+    """
+    A constant HUD label rasterized once with cv2.putText and blitted onto each
+    frame with a masked cv2.copyTo (~10x cheaper than re-rasterizing the glyphs).
+    Pixel-identical to cv2.putText; falls back to it when the text renderer
+    blends edges (OpenCV 5) or the label does not fit inside the frame.
+    """
+    def __init__(self, text, org, color, font_scale=0.7, thickness=2, font=cv2.FONT_HERSHEY_SIMPLEX):
+        self.args = (text, org, font, font_scale, color, thickness)
+        (width, height), baseline = cv2.getTextSize(text, font, font_scale, thickness)
+        pad = thickness
+        # White-on-black coverage map: anything but 0/255 means blended edges
+        coverage = np.zeros((height + baseline + 2 * pad, width + 2 * pad), dtype=np.uint8)
+        cv2.putText(coverage, text, (pad, height + pad), font, font_scale, 255, thickness)
+        self.blended = bool(((coverage > 0) & (coverage < 255)).any())
+        self.mask = (coverage > 0).astype(np.uint8)
+        self.sprite = np.zeros(coverage.shape + (3,), dtype=np.uint8)
+        self.sprite[coverage > 0] = color
+        self.x0 = org[0] - pad
+        self.y0 = org[1] - height - pad
+
+    def draw(self, frame):
+        """Draw the label onto `frame` in place."""
+        h, w = self.mask.shape
+        region = frame[max(self.y0, 0):self.y0 + h, max(self.x0, 0):self.x0 + w]
+        if self.blended or self.x0 < 0 or self.y0 < 0 or region.shape[:2] != (h, w):
+            cv2.putText(frame, *self.args)
+        else:
+            cv2.copyTo(self.sprite, self.mask, region)
+        return frame
@@ -1,7 +1,13 @@
 import time
+import queue
+import logging
+import threading
 import serial
 from serial import SerialException
 from brain.kinematics import solve_angles, compute_forward_kinematics
+from thread_priority import boost_current_thread
+
+log = logging.getLogger(__name__)
 
 class RobotArm:
     def __init__(self, simulation_mode=True, port='COM4', baudrate=115200, timeout=0.05):
@@ -15,9 +21,20 @@ class RobotArm:
             timeout (int): Serial read timeout in seconds
         """
         self.simulation_mode = simulation_mode
+        # Notified whenever current_angles is replaced (see current_angles property)
+        self.angles_changed = threading.Condition()
+        self.angles_version = 0
         self.current_angles = [0, 130, 130, 90, 12, 170]  # Default neutral position
+        # Target of the newest move (see commanded_angles property)
+        self._commanded_angles = list(self.current_angles)
         self.last_sent_angles = None # Track last sent command to prevent spamming
         self.serial = None
+        self.is_open = False  # Cached serial state for status/telemetry polling
+        
+        # Latest-wins motion queue for enqueue() (slider drags from Engineer Mode)
+        self._pending_moves = queue.Queue(maxsize=1)
+        self._pending_lock = threading.Lock()
+        self._move_worker = None
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
@@ -33,6 +50,39 @@ class RobotArm:
                 print("⚠️  Falling back to SIMULATION MODE.")
                 self.simulation_mode = True
 
+    @property
+    def current_angles(self):
+        """Last commanded USER angles. Always replaced as a whole list, never mutated in place."""
+        return self._current_angles
+
+    @current_angles.setter
+    def current_angles(self, angles):
+        with self.angles_changed:
+            self._current_angles = angles
+            self.angles_version += 1
+            self.angles_changed.notify_all()
+
+    @property
+    def commanded_angles(self):
+        """
+        Where the arm is headed: the (limited) target of the newest move_to() or
+        enqueue() call. current_angles only catches up once queued and in-flight
+        moves finish, so relative moves must be computed from this instead.
+        """
+        return self._commanded_angles
+
+    def wait_for_angles(self, last_version, timeout=1.0):
+        """
+        Block until current_angles changes from `last_version` or timeout elapses.
+        
+        Returns:
+            tuple: (angles_version, current_angles) - version == last_version on timeout
+        """
+        with self.angles_changed:
+            if self.angles_version == last_version:
+                self.angles_changed.wait(timeout)
+            return self.angles_version, self._current_angles
+
     def _connect_serial(self):
         """Establish serial connection to Arduino."""
         if self.serial is not None and self.serial.is_open:
@@ -44,6 +94,7 @@ class RobotArm:
                 baudrate=self.baudrate,
                 timeout=self.timeout
             )
+            self.is_open = True
             time.sleep(2)  # Wait for Arduino to reset after connection
             print(f"✅ Serial connection established on {self.port}")
             
@@ -53,6 +104,7 @@ class RobotArm:
                 print(f"📟 Arduino startup: {startup_msg.strip()}")
                 
         except SerialException as e:
+            self.is_open = False
             raise SerialException(f"Could not open serial port {self.port}: {e}")
 
     def move_to(self, angles, speed=1.0, force=False):
@@ -72,25 +124,12 @@ class RobotArm:
             print(f"❌ Error: Expected 6 angles, got {len(angles)}")
             return False
         
-        # Clamp angles to 0-180 range
-        clamped_angles = [max(0, min(180, int(angle))) for angle in angles]
+        clamped_angles = self._apply_limits(angles)
         
-        # -----------------------------------------------------------------
-        # SAFETY LIMITS (HARDWARE PROTECTION)
-        # -----------------------------------------------------------------
-        # Elbow (Index 2): Max 150°
-        if clamped_angles[2] > 150:
-            print(f"⚠️ SAFETY: Clamping Elbow from {clamped_angles[2]}° to 150°")
-            clamped_angles[2] = 150
-            
-        # Gripper (Index 5): Min 120°, Max 170°
-        if clamped_angles[5] < 120:
-             print(f"⚠️ SAFETY: Clamping Gripper from {clamped_angles[5]}° to 120°")
-             clamped_angles[5] = 120
-        elif clamped_angles[5] > 170:
-             print(f"⚠️ SAFETY: Clamping Gripper from {clamped_angles[5]}° to 170°")
-             clamped_angles[5] = 170
-        # -----------------------------------------------------------------
+        with self._pending_lock:
+            # A newer target already queued by enqueue() stays the commanded one
+            if self._pending_moves.empty():
+                self._commanded_angles = clamped_angles
         
         # Prepare angles for hardware (Invert Wrist Roll at index 4)
         # User sees 0-180, Hardware needs 180-0 for this specific servo
@@ -100,8 +139,8 @@ class RobotArm:
         if self.simulation_mode:
             # Simulation mode output
             packet = f"<{','.join(map(str, hardware_angles))}>"
-            print(f"📤 Simulated Command: {packet}")
-            print(f"   [Base: {clamped_angles[0]}°, Shoulder: {clamped_angles[1]}°, Elbow: {clamped_angles[2]}°, WristV: {clamped_angles[3]}°, WristR: {clamped_angles[4]}°(Inv), Grip: {clamped_angles[5]}°]")
+            log.debug("📤 Simulated Command: %s", packet)
+            log.debug("   [Base: %s°, Shoulder: %s°, Elbow: %s°, WristV: %s°, WristR: %s°(Inv), Grip: %s°]", *clamped_angles)
             
             # Interpolate movement for smoothness (1.0 second duration)
             duration = 1.0
@@ -143,7 +182,8 @@ class RobotArm:
                 
                 # Send packet WITH newline terminator
                 self.serial.write((packet + '\n').encode('utf-8'))
-                print(f"📤 Sent to Arduino: {packet} (User WristRoll: {clamped_angles[4]}° -> HW: {hardware_angles[4]}°)")
+                log.debug("📤 Sent to Arduino: %s (User WristRoll: %s° -> HW: %s°)",
+                          packet, clamped_angles[4], hardware_angles[4])
 
                 
                 # Wait for confirmation from Arduino
@@ -151,7 +191,7 @@ class RobotArm:
                 try:
                     response = self.serial.readline().decode().strip()
                     if response == 'K':
-                        print("✅ Arduino confirmed")
+                        log.debug("✅ Arduino confirmed")
                     elif response:
                         print(f"⚠️  Arduino sent: '{response}' (expected 'K')")
                 except:
@@ -170,6 +210,78 @@ class RobotArm:
                 print(f"❌ Unexpected error during move_to: {e}")
                 return False
 
+    @staticmethod
+    def _apply_limits(angles, warn=True):
+        """Clamp 6 angles to 0-180 and apply the hardware safety limits."""
+        # Clamp angles to 0-180 range
+        clamped_angles = [max(0, min(180, int(angle))) for angle in angles]
+        
+        # -----------------------------------------------------------------
+        # SAFETY LIMITS (HARDWARE PROTECTION)
+        # -----------------------------------------------------------------
+        # Elbow (Index 2): Max 150°
+        if clamped_angles[2] > 150:
+            if warn:
+                print(f"⚠️ SAFETY: Clamping Elbow from {clamped_angles[2]}° to 150°")
+            clamped_angles[2] = 150
+            
+        # Gripper (Index 5): Min 120°, Max 170°
+        if clamped_angles[5] < 120:
+            if warn:
+                print(f"⚠️ SAFETY: Clamping Gripper from {clamped_angles[5]}° to 120°")
+            clamped_angles[5] = 120
+        elif clamped_angles[5] > 170:
+            if warn:
+                print(f"⚠️ SAFETY: Clamping Gripper from {clamped_angles[5]}° to 170°")
+            clamped_angles[5] = 170
+        # -----------------------------------------------------------------
+        return clamped_angles
+
+    def enqueue(self, angles):
+        """
+        Queue a move for the background motion worker and return immediately.
+        Only the newest pending target is kept: targets superseded before the
+        worker picks them up are dropped, so a dragged slider sends at most one
+        command per serial round-trip instead of backing up the port.
+        """
+        with self._pending_lock:
+            if self._move_worker is None:
+                self._move_worker = threading.Thread(target=self._move_worker_loop, daemon=True)
+                self._move_worker.start()
+            try:
+                self._pending_moves.get_nowait()  # Drop the superseded target
+                self._pending_moves.task_done()
+            except queue.Empty:
+                pass
+            self._pending_moves.put_nowait(list(angles))
+            # move_to() warns about the limits when the worker runs it
+            self._commanded_angles = self._apply_limits(angles, warn=False)
+
+    def flush_moves(self):
+        """
+        Drop any queued target and wait for the move in progress to finish.
+        Call before switching from enqueue() back to blocking move_to() calls.
+        """
+        with self._pending_lock:
+            try:
+                self._pending_moves.get_nowait()
+                self._pending_moves.task_done()
+            except queue.Empty:
+                pass
+        self._pending_moves.join()
+
+    def _move_worker_loop(self):
+        """Background thread: executes queued targets one at a time."""
+        boost_current_thread("Motion", cpus_env="SERIAL_CPUS")
+        while True:
+            target = self._pending_moves.get()
+            try:
+                self.move_to(target)
+            except Exception as e:
+                print(f"❌ Queued move failed: {e}")
+            finally:
+                self._pending_moves.task_done()
+
     def move_to_sequenced(self, target_angles, speed=1.0):
         """
         Moves the robot to the specified angles one servo at a time (Bottom to Top).
@@ -226,7 +338,7 @@ class RobotArm:
             "angles": self.current_angles,
             "mode": "simulation" if self.simulation_mode else "hardware",
             "port": self.port if not self.simulation_mode else None,
-            "connected": self.serial.is_open if self.serial else False
+            "connected": self.is_open
         }
     
     def read_sensors(self):
@@ -306,6 +418,7 @@ class RobotArm:
 
     def close(self):
         """Close serial connection gracefully."""
+        self.is_open = False
         if self.serial and self.serial.is_open:
             self.serial.close()
             print(f"🔌 Serial connection to {self.port} closed.")
@@ -38,7 +38,7 @@ class HybridTracker:
         
         return (int(x), int(y), int(w), int(h))
 
-    def get_target(self, frame, model, target_class=None):
+    def get_target(self, frame, model, target_class=None, half=False):
         """
         Main pipeline method.
         
@@ -46,6 +46,7 @@ class HybridTracker:
             frame: Current video frame (cv2 image).
             model: Loaded YOLO model (Ultralytics).
             target_class: (Optional) Specific class name to filter for (e.g., 'bottle').
+            half: Run YOLO in FP16 (CUDA only).
             
         Returns:
             dict: {
@@ -59,7 +60,7 @@ class HybridTracker:
         # --- 1. YOLO DETECTION ---
         # Run inference with low confidence threshold to catch partials if possible,
         # but the request implies we expect it to fail at close range.
-        results = model(frame, verbose=False, conf=0.3) 
+        results = model(frame, verbose=False, conf=0.3, half=half)
         
         best_det = None
         max_conf = 0.0
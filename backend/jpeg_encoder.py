@@ -0,0 +1,52 @@
+"""
+JPEG Encoding for the Video Streams
+
+Encodes display frames with libjpeg-turbo (PyTurboJPEG, optional) when it is
+installed, otherwise with cv2.imencode. Both paths use quality 80 and 4:2:0
+chroma subsampling instead of OpenCV's default quality 95, which makes frames
+smaller on the wire and cheaper to encode.
+"""
+
+import cv2
+
+JPEG_QUALITY = 80
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420
+    _turbo = TurboJPEG()
+    print("[JPEG] Using libjpeg-turbo encoder")
+except Exception:
+    # Package missing, or the libturbojpeg shared library could not be found
+    _turbo = None
+
+
+def _cv2_params(quality):
+    params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+    if hasattr(cv2, 'IMWRITE_JPEG_SAMPLING_FACTOR'):
+        params += [cv2.IMWRITE_JPEG_SAMPLING_FACTOR, cv2.IMWRITE_JPEG_SAMPLING_FACTOR_420]
+    return params
+
+
+_DEFAULT_CV2_PARAMS = _cv2_params(JPEG_QUALITY)
+
+
+def encode_jpeg(image, quality=JPEG_QUALITY):
+    """
+    Encode a BGR image to JPEG.
+
+    Args:
+        image (np.ndarray): HxWx3 BGR image
+        quality (int): JPEG quality 1-100 (default 80)
+
+    Returns:
+        bytes: Encoded JPEG, or None if encoding failed
+    """
+    if _turbo is not None:
+        return _turbo.encode(image, quality=quality,
+                             pixel_format=TJPF_BGR, jpeg_subsample=TJSAMP_420)
+
+    params = _DEFAULT_CV2_PARAMS if quality == JPEG_QUALITY else _cv2_params(quality)
+    ret, jpeg = cv2.imencode('.jpg', image, params)
+    if not ret:
+        return None
+    return jpeg.tobytes()
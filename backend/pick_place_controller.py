@@ -31,6 +31,9 @@ class PickPlaceController:
         self.running = False
         self.state = "IDLE"
         self.thread = None
+        # Guards state/running/current_telemetry: written by the sequence thread,
+        # read by get_status() from request threads (re-entrant for stop())
+        self._status_lock = threading.RLock()
         
         # Operation parameters
         self.target_base_angle = 0  # Default target position (0 degrees)
@@ -63,14 +66,16 @@ class PickPlaceController:
             target_base_angle: Base rotation angle for placement (default: 0°)
             modifier: Placement distance modifier ("normal", "near", "far")
         """
-        if self.running:
-            print("⚠️ Pick-and-place already running!")
-            return False
+        # Check-and-set under the lock so two concurrent starts cannot both pass
+        with self._status_lock:
+            if self.running:
+                print("⚠️ Pick-and-place already running!")
+                return False
+            self.running = True
+            self.state = "STARTING"
         
         self.target_base_angle = target_base_angle
         self.modifier = modifier
-        self.running = True
-        self.state = "STARTING"
         
         print(f"\n{'='*60}")
         print(f"🚀 PICK-AND-PLACE STARTED")
@@ -89,18 +94,26 @@ class PickPlaceController:
         """Emergency stop the operation."""
         if self.running:
             print("🛑 EMERGENCY STOP - Pick-and-Place")
-            self.running = False
-            self.state = "STOPPED"
-            self.current_telemetry["state"] = "STOPPED"
-            self.current_telemetry["message"] = "Emergency stopped by user"
+            with self._status_lock:
+                self.running = False
+                self._set_state("STOPPED", "Emergency stopped by user")
+    
+    def _set_state(self, state, message, **telemetry):
+        """Update state, message and any extra telemetry as one step for get_status()."""
+        with self._status_lock:
+            self.state = state
+            self.current_telemetry["state"] = state
+            self.current_telemetry["message"] = message
+            self.current_telemetry.update(telemetry)
     
     def get_status(self):
-        """Get current status and telemetry."""
-        return {
-            "running": self.running,
-            "state": self.state,
-            **self.current_telemetry
-        }
+        """Get current status and telemetry (a consistent snapshot)."""
+        with self._status_lock:
+            return {
+                "running": self.running,
+                "state": self.state,
+                **self.current_telemetry
+            }
     
     def s_curve(self, t):
         """
@@ -151,9 +164,10 @@ class PickPlaceController:
             
             # Update telemetry
             progress = (i / steps) * 100.0
-            self.current_telemetry["phase"] = phase_name
-            self.current_telemetry["progress"] = progress
-            self.current_telemetry["current_angles"] = current_angles
+            with self._status_lock:
+                self.current_telemetry["phase"] = phase_name
+                self.current_telemetry["progress"] = progress
+                self.current_telemetry["current_angles"] = current_angles
             
             print(f"  [{phase_name}] Progress: {progress:.1f}% | Angles: {current_angles}")
             
@@ -165,9 +179,7 @@ class PickPlaceController:
             # ============================================================
             # PHASE 1: LIFTING
             # ============================================================
-            self.state = "LIFTING"
-            self.current_telemetry["state"] = "LIFTING"
-            self.current_telemetry["message"] = "Lifting object"
+            self._set_state("LIFTING", "Lifting object")
             
             print(f"\n{'='*60}")
             print("📤 PHASE 1: LIFTING OBJECT")
@@ -202,9 +214,7 @@ class PickPlaceController:
             # ============================================================
             # PHASE 2: ROTATING
             # ============================================================
-            self.state = "ROTATING"
-            self.current_telemetry["state"] = "ROTATING"
-            self.current_telemetry["message"] = f"Rotating to {self.target_base_angle}°"
+            self._set_state("ROTATING", f"Rotating to {self.target_base_angle}°")
             
             print(f"\n{'='*60}")
             print(f"🔄 PHASE 2: ROTATING BASE TO {self.target_base_angle}°")
@@ -236,9 +246,7 @@ class PickPlaceController:
             # ============================================================
             # PHASE 3: LOWERING
             # ============================================================
-            self.state = "LOWERING"
-            self.current_telemetry["state"] = "LOWERING"
-            self.current_telemetry["message"] = f"Lowering to placement height ({self.modifier})"
+            self._set_state("LOWERING", f"Lowering to placement height ({self.modifier})")
             
             print(f"\n{'='*60}")
             print(f"📥 PHASE 3: LOWERING OBJECT ({self.modifier.upper()})")
@@ -281,9 +289,7 @@ class PickPlaceController:
             # ============================================================
             # PHASE 4: RELEASING
             # ============================================================
-            self.state = "RELEASING"
-            self.current_telemetry["state"] = "RELEASING"
-            self.current_telemetry["message"] = "Releasing object"
+            self._set_state("RELEASING", "Releasing object")
             
             print(f"\n{'='*60}")
             print("🤲 PHASE 4: RELEASING OBJECT")
@@ -304,7 +310,8 @@ class PickPlaceController:
             self.robot.move_to(full_open)
             time.sleep(0.6)
             
-            self.current_telemetry["progress"] = 100.0
+            with self._status_lock:
+                self.current_telemetry["progress"] = 100.0
             print("  ✅ Object released")
             
             time.sleep(0.5)
@@ -315,9 +322,7 @@ class PickPlaceController:
             # ============================================================
             # PHASE 5: RETURNING HOME
             # ============================================================
-            self.state = "RETURNING"
-            self.current_telemetry["state"] = "RETURNING"
-            self.current_telemetry["message"] = "Returning to home position"
+            self._set_state("RETURNING", "Returning to home position")
             
             print(f"\n{'='*60}")
             print("🏠 PHASE 5: RETURNING HOME")
@@ -345,10 +350,7 @@ class PickPlaceController:
             # ============================================================
             # COMPLETE
             # ============================================================
-            self.state = "COMPLETE"
-            self.current_telemetry["state"] = "COMPLETE"
-            self.current_telemetry["message"] = "Pick-and-place complete!"
-            self.current_telemetry["progress"] = 100.0
+            self._set_state("COMPLETE", "Pick-and-place complete!", progress=100.0)
             
             print(f"\n{'='*60}")
             print("✅ PICK-AND-PLACE COMPLETE!")
@@ -358,9 +360,8 @@ class PickPlaceController:
             print(f"❌ Error during pick-and-place: {e}")
             import traceback
             traceback.print_exc()
-            self.state = "ERROR"
-            self.current_telemetry["state"] = "ERROR"
-            self.current_telemetry["message"] = f"Error: {str(e)}"
+            self._set_state("ERROR", f"Error: {str(e)}")
         
         finally:
-            self.running = False
+            with self._status_lock:
+                self.running = False
@@ -11,7 +11,7 @@ echo Step 1: Checking Python dependencies...
 python -c "import serial, flask, flask_cors" 2>nul
 if errorlevel 1 (
     echo Installing required packages...
-    pip install pyserial flask flask-cors python-dotenv
+    pip install pyserial flask flask-cors python-dotenv waitress
 ) else (
     echo ✓ All dependencies installed
 )
@@ -37,4 +37,4 @@ echo Step 4: Starting Flask backend...
 echo Press Ctrl+C to stop the server
 echo.
 
-python app.py
+python wsgi.py
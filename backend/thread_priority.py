@@ -0,0 +1,73 @@
+"""
+Best-effort Scheduling Hints for Latency-Sensitive Threads
+
+Raises the OS priority of the calling thread (detection worker, serial motion
+worker) so request handlers and stream writers don't preempt it, and can
+optionally pin it to specific CPU cores.
+
+Every call is best-effort: missing privileges, unsupported platforms or bad
+settings are logged on each call and otherwise ignored, so unprivileged setups
+behave exactly as before.
+
+Pinning is opt-in via environment variables holding a comma-separated core
+list (e.g. DETECTION_CPUS=2,3). It is off by default because threads spawned
+afterwards (e.g. PyTorch's CPU pool) inherit the mask.
+"""
+
+import os
+import sys
+import threading
+
+# Windows SetThreadPriority level
+THREAD_PRIORITY_ABOVE_NORMAL = 1
+# Linux per-thread nice value (negative needs CAP_SYS_NICE)
+ABOVE_NORMAL_NICE = -5
+
+
+def _parse_cpus(env_var):
+    value = os.environ.get(env_var, "").strip()
+    if not value:
+        return None
+    try:
+        return {int(c) for c in value.split(",") if c.strip()}
+    except ValueError:
+        print(f"[SCHED] Ignoring invalid {env_var}={value!r}")
+        return None
+
+
+def boost_current_thread(name, cpus_env=None):
+    """
+    Raise the calling thread's priority and optionally pin it to cores.
+
+    Args:
+        name (str): Label for log messages
+        cpus_env (str): Environment variable holding the core list to pin to
+
+    Returns:
+        bool: True if the priority was raised
+    """
+    raised = False
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            raised = bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(),
+                                                     THREAD_PRIORITY_ABOVE_NORMAL))
+        elif sys.platform.startswith("linux"):
+            # On Linux a thread id is a valid PRIO_PROCESS target (not on macOS/BSD)
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), ABOVE_NORMAL_NICE)
+            raised = True
+    except (OSError, AttributeError) as e:
+        print(f"[SCHED] Could not raise priority of {name} thread: {e}")
+
+    cpus = _parse_cpus(cpus_env) if cpus_env else None
+    if cpus and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cpus)  # 0 = calling thread
+            print(f"[SCHED] {name} thread pinned to CPUs {sorted(cpus)}")
+        except OSError as e:
+            print(f"[SCHED] Could not pin {name} thread: {e}")
+
+    if raised:
+        print(f"[SCHED] {name} thread priority raised")
+    return raised
@@ -12,6 +12,13 @@ import joblib
 from brain.anfis_pytorch import ANFIS
 from brain.visual_ik_solver import get_wrist_angles, GRIPPER_LENGTH
 
+# Gripper servo positions (degrees); the driver clamps the gripper to this range
+GRIPPER_OPEN = 170
+GRIPPER_CLOSED = 120
+# Shoulder/elbow pose used to lift and hold the object in pick-only mode
+HOLD_SHOULDER = 120
+HOLD_ELBOW = 120
+
 class VisualServoingAgent:
     """
     Visual Servoing Agent with Hybrid ML Control
@@ -64,8 +71,8 @@ class VisualServoingAgent:
             model = ANFIS(n_inputs=inputs, n_rules=rules, input_ranges=ranges)
             try:
                 if os.path.exists(path):
-                    model.load_state_dict(torch.load(path))
-                    model.eval()
+                    model.load_state_dict(torch.load(path, map_location='cpu', weights_only=True))
+                    model.freeze()
                     self.log(f"[ANFIS] Loaded {name} from {path}")
                     return model
                 else:
@@ -89,8 +96,8 @@ class VisualServoingAgent:
         
         try:
             if os.path.exists(model_path):
-                # Load checkpoint
-                checkpoint = torch.load(model_path)
+                # Load checkpoint (full pickle: it also carries the fitted scalers)
+                checkpoint = torch.load(model_path, map_location='cpu', weights_only=False)
                 
                 # Import model class
                 import torch.nn as nn
@@ -159,7 +166,7 @@ class VisualServoingAgent:
     def predict_x(self, error):
         """ (Error) -> Correction Delta (Degrees) """
         if not self.brain_x: return None
-        with torch.no_grad():
+        with torch.inference_mode():
             inp = torch.tensor([[error]], dtype=torch.float32)
             return self.brain_x(inp).item()
 
@@ -169,7 +176,7 @@ class VisualServoingAgent:
         self.auto_place = auto_place  # Flag to determine next action
         self.camera.set_target_object(target_object_name)
         self.running = True
-        self.thread = threading.Thread(target=self._servoing_loop, daemon=True)
+        self.thread = threading.Thread(target=self._run_servoing_loop, daemon=True)
         self.thread.start()
         self.log(f"🚀 Servoing STARTED for '{target_object_name}' (Auto-Place: {auto_place})")
         
@@ -179,6 +186,30 @@ class VisualServoingAgent:
             self.thread.join(timeout=1.0)
         self.log("🛑 Servoing STOPPED")
 
+    def _fresh_detections(self, timeout=0.5):
+        """
+        Detections from the next detection pass to complete after this call, instead of
+        whatever pass happened to land while the arm was still moving. Blocks on the
+        camera's detection Condition (no polling); falls back to the current list on
+        timeout or for cameras without wait_for_detection().
+        """
+        wait_for_detection = getattr(self.camera, 'wait_for_detection', None)
+        if wait_for_detection is None:
+            return self.camera.last_detection
+        _, detections = wait_for_detection(self.camera.detection_version, timeout)
+        return detections
+
+    def _run_servoing_loop(self):
+        """Thread target: holds a camera detection consumer for the loop's lifetime."""
+        add_consumer = getattr(self.camera, 'add_detection_consumer', None)
+        if add_consumer:
+            add_consumer()
+        try:
+            self._servoing_loop()
+        finally:
+            if add_consumer:
+                self.camera.remove_detection_consumer()
+
     def _servoing_loop(self):
         self.log("=" * 60)
         print("🎯 VISUAL SERVOING STARTED (SEARCH & ALIGN)", flush=True)
@@ -205,7 +236,7 @@ class VisualServoingAgent:
             # --- STAGE 1: SEARCH ---
             # Stop and get current detection
             time.sleep(0.15)  # Wait for robot to stabilize (Faster search)
-            detections = self.camera.last_detection
+            detections = self._fresh_detections()
             
             if not detections:
                 self.state = "SEARCHING"
@@ -308,8 +339,8 @@ class VisualServoingAgent:
                 # Wait for stabilization (reduced slightly since movement time covers some settling)
                 time.sleep(0.5)
                 
-                # Update Error
-                detections = self.camera.last_detection
+                # Update Error (from a frame taken after the arm settled)
+                detections = self._fresh_detections()
                 if not detections:
                     print("⚠️ Lost Object during alignment!")
                     break
@@ -360,7 +391,7 @@ class VisualServoingAgent:
         features_tensor = torch.FloatTensor(features_normalized)
         
         # Predict angles
-        with torch.no_grad():
+        with torch.inference_mode():
             output_normalized = self.mlp_model(features_tensor).numpy()
         
         # Denormalize
@@ -398,7 +429,6 @@ class VisualServoingAgent:
         self.log(f"   Elbow: {current_elbow:.1f}° → {elbow_target:.1f}°")
         
         # Open gripper
-        GRIPPER_OPEN = 170
         self.robot.move_to([int(current_base), int(current_shoulder), int(current_elbow), pitch, roll, GRIPPER_OPEN])
         time.sleep(0.5)
         
@@ -433,7 +463,6 @@ class VisualServoingAgent:
         self.log("\n🤏 Closing gripper...")
         self.current_telemetry["mode"] = "GRASPING"
         
-        GRIPPER_CLOSED = 120
         self.robot.move_to([
             int(base_target),
             int(shoulder_target),
@@ -464,8 +493,8 @@ class VisualServoingAgent:
             print("\n✋ Pick Only Mode: Lifting and Holding.")
             # Lift slightly to holding position
             lift_angles = list(self.robot.current_angles)
-            lift_angles[1] = 120 # Lift shoulder
-            lift_angles[2] = 120 # Adjust elbow
+            lift_angles[1] = HOLD_SHOULDER # Lift shoulder
+            lift_angles[2] = HOLD_ELBOW # Adjust elbow
             self.robot.move_to(lift_angles)
             self.current_telemetry["mode"] = "HOLDING"
             self.log("✅ Object Lifted and Held.")
@@ -485,7 +514,6 @@ class VisualServoingAgent:
         DISTANCE_THRESHOLD = 5.0  # cm
         SHOULDER_LIMIT = 0  # degrees
         Y_ERROR_THRESHOLD = 20  # pixels
-        GRIPPER_OPEN = 170
         
         # Open gripper at start
         self.robot.move_to([base, shoulder, elbow, pitch, roll, GRIPPER_OPEN])
@@ -500,7 +528,7 @@ class VisualServoingAgent:
             
             # Get current detection
             time.sleep(0.3)  # Stabilization
-            detections = self.camera.last_detection
+            detections = self._fresh_detections()
             
             if not detections:
                 self.log("⚠️ Lost object during approach!")
@@ -575,8 +603,8 @@ class VisualServoingAgent:
                 self.robot.move_to([base, shoulder, elbow, pitch, roll, GRIPPER_OPEN])
                 time.sleep(1.0)  # Stabilization
                 
-                # Get fresh detection
-                detections = self.camera.last_detection
+                # Get fresh detection (from a frame taken after the move settled)
+                detections = self._fresh_detections()
                 if not detections:
                     self.log("    ⚠️ Lost object during Y alignment!")
                     break
@@ -712,7 +740,7 @@ class VisualServoingAgent:
         print(f"  [IK] Calculated Lunge: dS={d_shoulder:.1f}, dE={d_elbow:.1f}", flush=True)
         print(f"  [IK] Move: S{self.robot.current_angles[1]}->{int(s_new)}, E{self.robot.current_angles[2]}->{int(e_new)}", flush=True)
         
-        self.robot.move_to([base, int(s_new), int(e_new), pitch, roll, 170])
+        self.robot.move_to([base, int(s_new), int(e_new), pitch, roll, GRIPPER_OPEN])
         time.sleep(1.0)
         
         self._close_gripper(base, int(s_new), int(e_new), pitch, roll)
@@ -752,8 +780,8 @@ class VisualServoingAgent:
         elif not getattr(self, 'auto_place', True):
             print("\n✋ Pick Only Mode: Lifting and Holding.")
             lift_angles = list(self.robot.current_angles)
-            lift_angles[1] = 120 
-            lift_angles[2] = 120
+            lift_angles[1] = HOLD_SHOULDER
+            lift_angles[2] = HOLD_ELBOW
             self.robot.move_to(lift_angles)
             self.current_telemetry["mode"] = "HOLDING"
             self.log("✅ Object Lifted and Held.")
@@ -0,0 +1,53 @@
+"""
+Production WSGI entry point for the Robotic Arm backend.
+
+app.run() starts Werkzeug's development server, which is not meant for
+production use and ships the debugger and reloader. Run the app under a
+production server with a configurable thread pool instead:
+
+    Windows / any OS:
+        python backend/wsgi.py                  (Waitress)
+
+    Linux:
+        cd backend && gunicorn -w 1 -k gthread --threads 16 -b 0.0.0.0:5000 wsgi:app
+
+Always use ONE worker process: the camera, serial port and controllers are
+module-level singletons in app.py and cannot be shared between processes.
+Every worker would open its own VideoCapture and serial connection, so
+extra workers add contention rather than throughput. Within the process,
+frames are already handed from the capture thread to the encoder, inference
+and streaming threads by reference (no copies), and slow LLM calls run on a
+bounded pool (brain.llm_engine), so scale with --threads, not -w.
+Threads (not gevent greenlets) are used because the capture, inference and
+serial loops block inside C calls that would stall a gevent hub.
+
+Every open /video_feed, /mimic_video_feed or /servo_stream connection holds
+one server thread, so size the pool for (streams per dashboard x dashboards)
+plus headroom for the JSON routes, e.g. BACKEND_THREADS=32.
+"""
+
+import os
+
+from app import app
+
+HOST = '0.0.0.0'
+PORT = 5000
+# Each MJPEG/SSE client holds one thread for the lifetime of its stream
+THREADS = int(os.environ.get('BACKEND_THREADS', 16))
+
+
+def serve(host=HOST, port=PORT, threads=THREADS):
+    """Serve the Flask app with Waitress, falling back to threaded Werkzeug."""
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        print("[SERVER] waitress not installed - falling back to threaded Werkzeug server.")
+        app.run(host=host, port=port, threaded=True, debug=False, use_reloader=False)
+        return
+
+    print(f"[SERVER] Waitress serving on http://{host}:{port} ({threads} threads)")
+    waitress_serve(app, host=host, port=port, threads=threads)
+
+
+if __name__ == '__main__':
+    serve()
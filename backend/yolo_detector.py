@@ -6,8 +6,18 @@ Handles object detection using YOLOv8 model
 import cv2
 import numpy as np
 import os
+import logging
 from ultralytics import YOLO
 from coordinate_mapper import CoordinateMapper
+from brain.distance_estimator import build_known_width_lut
+
+try:
+    import torch
+    CUDA_AVAILABLE = torch.cuda.is_available()
+except ImportError:
+    CUDA_AVAILABLE = False
+
+log = logging.getLogger(__name__)
 
 
 class YOLODetector:
@@ -26,11 +36,24 @@ class YOLODetector:
                 print(f"[YOLO] Found local model file: {local_path}")
                 model_name = local_path
         
+        # On CUDA, prefer a TensorRT engine exported next to the weights:
+        #   yolo export model=yolov8n.pt format=engine half=True imgsz=640
+        # YOLO-World needs set_classes() on the PyTorch model, so it keeps the .pt.
+        engine_path = os.path.splitext(model_name)[0] + '.engine'
+        self.is_engine = (CUDA_AVAILABLE and 'world' not in os.path.basename(model_name)
+                          and os.path.exists(engine_path))
+        if self.is_engine:
+            model_name = engine_path
+        
+        # FP16 inference on CUDA (Tensor Cores); CPU stays FP32
+        self.half = CUDA_AVAILABLE
+        
         print(f"[YOLO] Loading model: {model_name}")
         self.model = YOLO(model_name)
+        self._index_vocabulary()
         self.confidence_threshold = confidence_threshold
         self.mapper = None
-        print(f"[YOLO] Model loaded successfully! Confidence threshold: {confidence_threshold}")
+        print(f"[YOLO] Model loaded successfully! Confidence threshold: {confidence_threshold} (FP16: {self.half})")
 
     def set_classes(self, classes):
         """
@@ -39,13 +62,43 @@ class YOLODetector:
         Args:
             classes: List of strings (e.g., ["red cube", "bottle"]) or None to reset.
         """
+        if self.is_engine:
+            print("[YOLO] TensorRT engine has a fixed vocabulary - ignoring set_classes()")
+            return
         if classes:
             print(f"[YOLO-World] Setting focus classes: {classes}")
             self.model.set_classes(classes)
         else:
             print("[YOLO-World] Resetting classes (detecting everything in model vocabulary)")
             self.model.set_classes(None) # Reset to default
+        self._index_vocabulary()
+
+    def _index_vocabulary(self):
+        """Rebuild the per-class lookups; called whenever the vocabulary changes."""
+        names = self.model.names
+        # Class id -> known width (cm)
+        self.known_width_lut = build_known_width_lut(names)
+        # Lowercased class name -> class ids, so target filtering compares ints per frame
+        class_ids_by_name = {}
+        for class_id, name in (names.items() if isinstance(names, dict) else enumerate(names)):
+            class_ids_by_name.setdefault(str(name).lower(), set()).add(int(class_id))
+        self.class_ids_by_name = {name: frozenset(ids) for name, ids in class_ids_by_name.items()}
 
+    def warmup(self, n=3, shape=(720, 1280, 3)):
+        """
+        Run a few dummy inferences so CUDA/cuDNN autotuning and lazy model setup
+        happen at startup instead of on the first real frame.
+        
+        Args:
+            n: Number of dummy passes
+            shape: Frame shape to warm up with (match the camera resolution)
+        """
+        dummy = np.zeros(shape, dtype=np.uint8)
+        start = cv2.getTickCount()
+        for _ in range(n):
+            self.model(dummy, conf=self.confidence_threshold, verbose=False, half=self.half)
+        elapsed = (cv2.getTickCount() - start) / cv2.getTickFrequency()
+        print(f"[YOLO] Warm-up done ({n} passes, {elapsed:.2f}s)")
     
     def detect_objects(self, frame):
         """
@@ -69,7 +122,7 @@ class YOLODetector:
             self.mapper = CoordinateMapper(width, height)
         
         # Run YOLO inference
-        results = self.model(frame, conf=self.confidence_threshold, verbose=False)
+        results = self.model(frame, conf=self.confidence_threshold, verbose=False, half=self.half)
         
         detections = []
         
@@ -81,22 +134,25 @@ class YOLODetector:
                 print(f"[YOLO-DEBUG] Found {len(boxes)} raw detections")
                 self._last_box_count = len(boxes)
             
-            for box in boxes:
-                # Get bounding box coordinates
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                
+            # One device->host copy per tensor for all boxes (not three per box)
+            all_xyxy = boxes.xyxy.cpu().numpy()
+            all_cls = boxes.cls.cpu().numpy().astype(int)
+            all_conf = boxes.conf.cpu().numpy()
+            
+            for xyxy, class_id, confidence in zip(all_xyxy.tolist(), all_cls, all_conf):
+                x1, y1, x2, y2 = xyxy
                 # Calculate center point
                 cx = int((x1 + x2) / 2)
                 cy = int((y1 + y2) / 2)
                 
                 # Get class name and confidence
-                class_id = int(box.cls[0])
-                confidence = float(box.conf[0])
+                class_id = int(class_id)
+                confidence = float(confidence)
                 object_name = self.model.names[class_id]
                 
-                # Only print first detection (reduce spam)
+                # Only log first detection (reduce spam)
                 if len(detections) == 0:
-                    print(f"[YOLO-DEBUG] Detected: {object_name} (conf={confidence:.2f})")
+                    log.debug("[YOLO-DEBUG] Detected: %s (conf=%.2f)", object_name, confidence)
                 
                 # Convert to real-world coordinates (cm)
                 cm_x, cm_y = self.mapper.pixel_to_cm(cx, cy)
@@ -108,8 +164,11 @@ class YOLODetector:
                 
                 detection = {
                     'object_name': object_name,
+                    'class_id': class_id,
                     'confidence': confidence,
                     'bbox': [int(x1), int(y1), int(x2), int(y2)],
+                    # Unrounded box: sub-pixel edges for distance estimation
+                    'bbox_f': xyxy,
                     'center': [cx, cy],
                     'relative_pos': [dx, dy],
                     'cm_x': cm_x,